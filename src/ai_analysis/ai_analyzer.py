@@ -1,14 +1,15 @@
 # src/ai_analysis/ai_analyzer.py
 
 import os
-import json
+import orjson
 import time
+import asyncio
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.callbacks import BaseCallbackHandler
 import logging
@@ -17,6 +18,8 @@ from src.storage.sqlite_manager import SQLiteManager
 from langsmith import traceable
 
 from utils.logger import get_logger
+from utils.caching import SemanticCache
+from utils.llm_client import get_chat_model, get_rate_limiter, run_async
 
 logger = get_logger(__name__)
 
@@ -24,6 +27,61 @@ logger = get_logger(__name__)
 
 os.environ["LANGCHAIN_TRACING_V2"] = "true"  
 
+# Batch analysis: max in-flight Gemini calls and request budget per minute
+BATCH_CONCURRENCY = 8
+GEMINI_REQUESTS_PER_MINUTE = 60
+
+# Number of emails fused into a single Gemini prompt during batch analysis
+EMAILS_PER_PROMPT = 6
+
+# System prompt shared by single-email and batched analysis, built once. Every
+# request opens with the same text, so Gemini's implicit caching can reuse it
+SYSTEM_PROMPT = """You are an expert email analysis AI assistant. Your task is to analyze emails and provide:
+
+1. **Summary**: A concise 2-3 sentence summary of the email's main points
+2. **Priority Score**: Rate 1-5 (5 = highest priority, needs immediate attention)
+3. **Priority Reason**: Brief explanation for the priority score
+4. **Sentiment**: One of: positive, negative, neutral, urgent
+5. **Action Required**: Boolean - does this email require action from the recipient?
+6. **Suggested Actions**: List of specific actions the recipient should take
+7. **Key Topics**: List of main topics/themes discussed
+8. **Draft Reply**: A professional draft response (or "No reply needed" if appropriate)
+
+Consider these factors for priority scoring:
+- Time-sensitive requests (meetings, deadlines) = Higher priority
+- Questions requiring answers = Medium-high priority  
+- FYI/newsletters = Lower priority
+- Urgent language/tone = Higher priority
+- Important stakeholders = Higher priority
+
+Respond in valid JSON format only."""
+
+SYSTEM_MSG = SystemMessage(content=SYSTEM_PROMPT)
+
+
+# All dashboard statistics in one round-trip; json() keeps the nested objects as JSON
+ANALYSIS_STATS_SQL = """
+    SELECT json_object(
+        'total', (SELECT COUNT(*) FROM email_analysis),
+        'priority', json((SELECT json_group_object(priority_score, cnt) FROM (
+            SELECT priority_score, COUNT(*) AS cnt FROM email_analysis
+            WHERE priority_score IS NOT NULL GROUP BY priority_score))),
+        'sentiment', json((SELECT json_group_object(sentiment, cnt) FROM (
+            SELECT sentiment, COUNT(*) AS cnt FROM email_analysis
+            WHERE sentiment IS NOT NULL GROUP BY sentiment))),
+        'action', (SELECT COUNT(*) FROM email_analysis WHERE action_required = 1),
+        'emails', (SELECT COUNT(*) FROM emails)
+    ) AS stats
+"""
+
+INSERT_ANALYSIS_SQL = """
+    INSERT OR REPLACE INTO email_analysis 
+    (email_id, gmail_id, summary, priority_score, priority_reason, 
+     sentiment, draft_reply, action_required, suggested_actions, 
+     key_topics, analysis_timestamp, processing_time_ms)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 @dataclass
 class EmailAnalysis:
     """Data structure for AI analysis results"""
@@ -47,16 +105,31 @@ class AIEmailAnalyzer:
         self.db = SQLiteManager()
         self._setup_ai_model()
         self._create_analysis_tables()
+        # Near-duplicate emails (newsletters, notifications) reuse a prior analysis
+        self.semantic_cache = SemanticCache(self.db, table="cached_analyses", threshold=0.92)
+        self._analyzed_ids = self._load_analyzed_ids()
         
     def _setup_ai_model(self):
         """Initialize Gemini 2.5 Flash model with LangChain"""
         try:
-            self.llm = ChatGoogleGenerativeAI(
+            # One limiter shared by both models keeps all Gemini calls within quota
+            rate_limiter = get_rate_limiter(GEMINI_REQUESTS_PER_MINUTE, BATCH_CONCURRENCY)
+            self.llm = get_chat_model(
                 model="gemini-2.5-flash",
                 temperature=0.1,
                 max_tokens=2048,
                 timeout=30,
                 max_retries=3,
+                rate_limiter=rate_limiter,
+            )
+            # Batched prompts return one analysis per email, so allow a proportionally longer output
+            self.batch_llm = get_chat_model(
+                model="gemini-2.5-flash",
+                temperature=0.1,
+                max_tokens=2048 * EMAILS_PER_PROMPT,
+                timeout=90,
+                max_retries=3,
+                rate_limiter=rate_limiter,
             )
             logger.info("✅ Gemini 2.5 Flash model initialized successfully")
         except Exception as e:
@@ -96,24 +169,35 @@ class AIEmailAnalyzer:
                 # Column probably already exists
                 pass
             
+            # Indexes for the high-priority listing and stats group-bys
+            self.db.cursor.execute("CREATE INDEX IF NOT EXISTS idx_ea_priority ON email_analysis(priority_score DESC, email_id);")
+            self.db.cursor.execute("CREATE INDEX IF NOT EXISTS idx_ea_sentiment ON email_analysis(sentiment);")
+            self.db.cursor.execute("CREATE INDEX IF NOT EXISTS idx_ea_action ON email_analysis(action_required);")
+            # The unanalyzed scan is an anti-join served by idx_emails_date and UNIQUE(email_id);
+            # the old ai_analyzed index no longer has a reader
+            self.db.cursor.execute("DROP INDEX IF EXISTS idx_emails_unanalyzed;")
+            
             self.db.conn.commit()
             logger.info("✅ AI analysis tables created/verified")
             
         except Exception as e:
             logger.error(f"❌ Failed to create analysis tables: {e}")
     
-    def analyze_email(self, email_data: Dict) -> Optional[EmailAnalysis]:
-        """Analyze a single email using AI"""
+    def analyze_email(self, email_data: Dict, skip_dedup_check: bool = False) -> Optional[EmailAnalysis]:
+        """Analyze a single email using AI.
+
+        Pass skip_dedup_check=True when the caller already knows the email is
+        unanalyzed (e.g. it came from _get_unanalyzed_emails).
+        """
         start_time = time.time()
         
         try:
             email_id = email_data.get('id')
-            gmail_id = email_data.get('gmail_id', email_data.get('id', ''))
             
             logger.info(f"🤖 Analyzing email {email_id}: {email_data.get('subject', '')[:50]}...")
             
             # Check if already analyzed
-            if self._is_already_analyzed(email_id):
+            if not skip_dedup_check and self._is_already_analyzed(email_id):
                 logger.info(f"⏭️ Email {email_id} already analyzed, skipping")
                 return self._get_existing_analysis(email_id)
             
@@ -123,37 +207,68 @@ class AIEmailAnalyzer:
             # Run AI analysis
             analysis_results = self._run_ai_analysis(email_content)
             
-            # Create analysis object
-            processing_time = int((time.time() - start_time) * 1000)
-            
-            analysis = EmailAnalysis(
-                email_id=email_id,
-                gmail_id=gmail_id,
-                summary=analysis_results['summary'],
-                priority_score=analysis_results['priority_score'],
-                priority_reason=analysis_results['priority_reason'],
-                sentiment=analysis_results['sentiment'],
-                draft_reply=analysis_results['draft_reply'],
-                action_required=analysis_results['action_required'],
-                suggested_actions=analysis_results['suggested_actions'],
-                key_topics=analysis_results['key_topics'],
-                analysis_timestamp=datetime.now().isoformat(),
-                processing_time_ms=processing_time
-            )
+            return self._save_analysis(email_data, analysis_results, start_time)
             
-            # Store in database
-            self._store_analysis(analysis)
+        except Exception as e:
+            logger.error(f"❌ Failed to analyze email {email_data.get('id')}: {e}")
+            return None
+    
+    async def analyze_email_async(self, email_data: Dict, persist: bool = True,
+                                  skip_dedup_check: bool = False) -> Optional[EmailAnalysis]:
+        """Analyze a single email using AI without blocking the event loop on Gemini.
+
+        With persist=False the caller is responsible for storing the result
+        (batch analysis writes everything in one transaction).
+        """
+        start_time = time.time()
+        
+        try:
+            email_id = email_data.get('id')
             
-            # Mark email as analyzed
-            self._mark_email_analyzed(email_id)
+            logger.info(f"🤖 Analyzing email {email_id}: {email_data.get('subject', '')[:50]}...")
             
-            logger.info(f"✅ Email {email_id} analyzed successfully in {processing_time}ms")
-            return analysis
+            if not skip_dedup_check and self._is_already_analyzed(email_id):
+                logger.info(f"⏭️ Email {email_id} already analyzed, skipping")
+                return self._get_existing_analysis(email_id)
+            
+            email_content = self._prepare_email_content(email_data)
+            analysis_results = await self._run_ai_analysis_async(email_content)
+            
+            return self._save_analysis(email_data, analysis_results, start_time, persist=persist)
             
         except Exception as e:
             logger.error(f"❌ Failed to analyze email {email_data.get('id')}: {e}")
             return None
     
+    def _save_analysis(self, email_data: Dict, analysis_results: Dict, start_time: float,
+                       persist: bool = True) -> EmailAnalysis:
+        """Build the analysis object from AI results, store it and mark the email analyzed"""
+        email_id = email_data.get('id')
+        gmail_id = email_data.get('gmail_id', email_data.get('id', ''))
+        processing_time = int((time.time() - start_time) * 1000)
+        
+        analysis = EmailAnalysis(
+            email_id=email_id,
+            gmail_id=gmail_id,
+            summary=analysis_results['summary'],
+            priority_score=analysis_results['priority_score'],
+            priority_reason=analysis_results['priority_reason'],
+            sentiment=analysis_results['sentiment'],
+            draft_reply=analysis_results['draft_reply'],
+            action_required=analysis_results['action_required'],
+            suggested_actions=analysis_results['suggested_actions'],
+            key_topics=analysis_results['key_topics'],
+            analysis_timestamp=datetime.now().isoformat(),
+            processing_time_ms=processing_time
+        )
+        
+        if persist:
+            # Store in database and mark the email as analyzed
+            self._store_analysis(analysis)
+        
+        logger.info(f"✅ Email {email_id} analyzed successfully in {processing_time}ms")
+        return analysis
+    
     def _prepare_email_content(self, email_data: Dict) -> str:
         """Prepare email content for AI analysis with HTML cleaning"""
         sender = email_data.get('sender', 'Unknown')
@@ -163,7 +278,7 @@ class AIEmailAnalyzer:
         snippet = email_data.get('snippet', '')
         category = email_data.get('category', 'Other')
         
-        # Clean HTML content using BeautifulSoup
+        # Clean HTML content
         clean_body = self._clean_html_content(body) if body else ""
         clean_snippet = self._clean_html_content(snippet) if snippet else ""
         
@@ -183,58 +298,31 @@ Email Content:
         return email_text
     
     def _clean_html_content(self, html_content: str) -> str:
-        """Clean HTML content using BeautifulSoup"""
+        """Clean HTML content using selectolax (Lexbor)"""
         if not html_content:
             return ""
         
+        # Plain-text bodies (no tags, no entities) don't need a parser at all
+        if '<' not in html_content and '&' not in html_content:
+            return ' '.join(html_content.split())
+        
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            tree = LexborHTMLParser(html_content)
             
             # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Get text and clean it up
-            text = soup.get_text()
-            
-            # Break into lines and remove leading and trailing space on each
-            lines = (line.strip() for line in text.splitlines())
+            for node in tree.css('script,style'):
+                node.decompose()
             
-            # Break multi-headlines into a line each
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+            text = tree.body.text(separator=' ', strip=True) if tree.body else ''
             
-            # Drop blank lines
-            text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            return text
+            # Collapse runs of whitespace into single spaces
+            return ' '.join(text.split())
         except Exception as e:
             logger.error(f"❌ Failed to clean HTML content: {e}")
             return html_content
         
-    @traceable(name="analyze_single_email")
-    def _run_ai_analysis(self, email_content: str) -> Dict:
-        """Run comprehensive AI analysis on email content"""
-        
-        system_prompt = """You are an expert email analysis AI assistant. Your task is to analyze emails and provide:
-
-1. **Summary**: A concise 2-3 sentence summary of the email's main points
-2. **Priority Score**: Rate 1-5 (5 = highest priority, needs immediate attention)
-3. **Priority Reason**: Brief explanation for the priority score
-4. **Sentiment**: One of: positive, negative, neutral, urgent
-5. **Action Required**: Boolean - does this email require action from the recipient?
-6. **Suggested Actions**: List of specific actions the recipient should take
-7. **Key Topics**: List of main topics/themes discussed
-8. **Draft Reply**: A professional draft response (or "No reply needed" if appropriate)
-
-Consider these factors for priority scoring:
-- Time-sensitive requests (meetings, deadlines) = Higher priority
-- Questions requiring answers = Medium-high priority  
-- FYI/newsletters = Lower priority
-- Urgent language/tone = Higher priority
-- Important stakeholders = Higher priority
-
-Respond in valid JSON format only."""
-
+    def _build_analysis_messages(self, email_content: str) -> List:
+        """Build the system/user messages for analyzing one email"""
         user_prompt = f"""Analyze this email:
 
 {email_content}
@@ -251,36 +339,153 @@ Provide analysis in this exact JSON format:
     "draft_reply": "Draft response or 'No reply needed'"
 }}"""
 
+        return [
+            SYSTEM_MSG,
+            HumanMessage(content=user_prompt)
+        ]
+    
+    def _build_batch_analysis_messages(self, email_contents: List[str]) -> List:
+        """Build the system/user messages for analyzing several emails in one call"""
+        numbered_emails = "\n\n".join(
+            f"[[EMAIL {i}]]\n{content}" for i, content in enumerate(email_contents, 1)
+        )
+        
+        user_prompt = f"""Analyze each of the following {len(email_contents)} emails independently:
+
+{numbered_emails}
+
+Return a JSON array with exactly {len(email_contents)} analysis objects, in the same order as the emails above.
+Each object must use this exact format:
+{{
+    "summary": "Brief summary here",
+    "priority_score": 1-5,
+    "priority_reason": "Explanation for priority",
+    "sentiment": "positive/negative/neutral/urgent",
+    "action_required": true/false,
+    "suggested_actions": ["action1", "action2"],
+    "key_topics": ["topic1", "topic2"],
+    "draft_reply": "Draft response or 'No reply needed'"
+}}"""
+
+        return [
+            SYSTEM_MSG,
+            HumanMessage(content=user_prompt)
+        ]
+    
+    def _load_json_response(self, response_text: str):
+        """Decode a JSON model response, tolerating markdown code fences"""
+        response_text = response_text.strip()
+        
+        # Clean up response if it has markdown formatting
+        if response_text.startswith('```json'):
+            response_text = response_text.replace('```json', '').replace('```', '').strip()
+        
+        return orjson.loads(response_text)
+    
+    def _parse_analysis_response(self, response_text: str) -> Dict:
+        """Parse the model's JSON response into validated analysis results"""
+        analysis_results = self._load_json_response(response_text)
+        
+        # Validate and clean results
+        return self._validate_analysis_results(analysis_results)
+    
+    def _try_parse_partial_response(self, response_text: str) -> Optional[Dict]:
+        """Parse a streamed response once it looks complete, or None to keep reading"""
+        if not response_text.rstrip().endswith('}'):
+            return None
         try:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
+            return self._parse_analysis_response(response_text)
+        except orjson.JSONDecodeError:
+            return None
+    
+    def _parse_batch_analysis_response(self, response_text: str, expected: int) -> List[Dict]:
+        """Parse a batched JSON array response into per-email validated results"""
+        batch_results = self._load_json_response(response_text)
+        
+        if not isinstance(batch_results, list) or len(batch_results) != expected:
+            raise ValueError(f"expected {expected} analyses, got {len(batch_results) if isinstance(batch_results, list) else 'non-list'}")
+        
+        return [self._validate_analysis_results(results) for results in batch_results]
+    
+    @traceable(name="analyze_single_email")
+    def _run_ai_analysis(self, email_content: str) -> Dict:
+        """Run comprehensive AI analysis on email content"""
+        response = ""
+        try:
+            embedding = self.semantic_cache.embed(email_content)
+            cached = self.semantic_cache.lookup(embedding)
+            if cached:
+                return self._validate_analysis_results(orjson.loads(cached))
+            
+            messages = self._build_analysis_messages(email_content)
+            
+            # Stream the response and stop as soon as a complete JSON object has arrived
+            analysis_results = None
+            for chunk in self.llm.stream(messages):
+                response += chunk.content
+                analysis_results = self._try_parse_partial_response(response)
+                if analysis_results is not None:
+                    break
+            
+            if analysis_results is None:
+                analysis_results = self._parse_analysis_response(response)
+            
+            self.semantic_cache.add(embedding, orjson.dumps(analysis_results).decode())
+            return analysis_results
+            
+        except orjson.JSONDecodeError as e:
+            logger.error(f"❌ Failed to parse AI response as JSON: {e}")
+            logger.error(f"Response was: {response}")
+            return self._get_fallback_analysis()
             
-            # Fixed: Remove callbacks parameter that was causing the error
-            response = self.llm.invoke(messages)
+        except Exception as e:
+            logger.error(f" AI analysis failed: {e}")
+            return self._get_fallback_analysis()
+    
+    @traceable(name="analyze_single_email_async")
+    async def _run_ai_analysis_async(self, email_content: str) -> Dict:
+        """Async variant of _run_ai_analysis using the model's astream"""
+        response = ""
+        try:
+            embedding = await self.semantic_cache.aembed(email_content)
+            cached = self.semantic_cache.lookup(embedding)
+            if cached:
+                return self._validate_analysis_results(orjson.loads(cached))
             
-            # Parse JSON response
-            response_text = response.content.strip()
+            messages = self._build_analysis_messages(email_content)
             
-            # Clean up response if it has markdown formatting
-            if response_text.startswith('```json'):
-                response_text = response_text.replace('```json', '').replace('```', '').strip()
+            analysis_results = None
+            async for chunk in self.llm.astream(messages):
+                response += chunk.content
+                analysis_results = self._try_parse_partial_response(response)
+                if analysis_results is not None:
+                    break
             
-            analysis_results = json.loads(response_text)
+            if analysis_results is None:
+                analysis_results = self._parse_analysis_response(response)
             
-            # Validate and clean results
-            return self._validate_analysis_results(analysis_results)
+            self.semantic_cache.add(embedding, orjson.dumps(analysis_results).decode())
+            return analysis_results
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"❌ Failed to parse AI response as JSON: {e}")
-            logger.error(f"Response was: {response.content}")
+            logger.error(f"Response was: {response}")
             return self._get_fallback_analysis()
             
         except Exception as e:
             logger.error(f" AI analysis failed: {e}")
             return self._get_fallback_analysis()
     
+    @traceable(name="analyze_email_batch")
+    def _run_ai_analysis_batch(self, email_contents: List[str]) -> List[Dict]:
+        """Analyze several emails with a single Gemini call.
+
+        Raises on a malformed or mismatched response so callers can fall back
+        to per-email analysis.
+        """
+        response = self.batch_llm.invoke(self._build_batch_analysis_messages(email_contents))
+        return self._parse_batch_analysis_response(response.content, len(email_contents))
+    
     def _validate_analysis_results(self, results: Dict) -> Dict:
         """Validate and clean AI analysis results"""
         validated = {
@@ -314,36 +519,78 @@ Provide analysis in this exact JSON format:
             'draft_reply': 'AI draft unavailable - please compose manually'
         }
     
+    def _analysis_row(self, analysis: EmailAnalysis) -> Tuple:
+        """Flatten an analysis into the email_analysis column order"""
+        return (
+            analysis.email_id,
+            analysis.gmail_id,
+            analysis.summary,
+            analysis.priority_score,
+            analysis.priority_reason,
+            analysis.sentiment,
+            analysis.draft_reply,
+            analysis.action_required,
+            orjson.dumps(analysis.suggested_actions).decode(),
+            orjson.dumps(analysis.key_topics).decode(),
+            analysis.analysis_timestamp,
+            analysis.processing_time_ms
+        )
+    
     def _store_analysis(self, analysis: EmailAnalysis):
-        """Store analysis results in database"""
+        """Store analysis results and mark the email analyzed in one transaction"""
         try:
-            self.db.cursor.execute("""
-                INSERT OR REPLACE INTO email_analysis 
-                (email_id, gmail_id, summary, priority_score, priority_reason, 
-                 sentiment, draft_reply, action_required, suggested_actions, 
-                 key_topics, analysis_timestamp, processing_time_ms)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                analysis.email_id,
-                analysis.gmail_id,
-                analysis.summary,
-                analysis.priority_score,
-                analysis.priority_reason,
-                analysis.sentiment,
-                analysis.draft_reply,
-                analysis.action_required,
-                json.dumps(analysis.suggested_actions),
-                json.dumps(analysis.key_topics),
-                analysis.analysis_timestamp,
-                analysis.processing_time_ms
-            ))
-            self.db.conn.commit()
+            with self.db.conn:
+                self.db.cursor.execute(INSERT_ANALYSIS_SQL + " RETURNING email_id", self._analysis_row(analysis))
+                email_id = self.db.cursor.fetchone()['email_id']
+                self.db.cursor.execute(
+                    "UPDATE emails SET ai_analyzed = TRUE WHERE id = ?", (email_id,)
+                )
+            self._analyzed_ids.add(email_id)
             
         except Exception as e:
             logger.error(f"❌ Failed to store analysis: {e}")
     
+    def _store_analyses_bulk(self, analyses: List[EmailAnalysis]):
+        """Store many analyses and mark their emails analyzed in a single transaction"""
+        if not analyses:
+            return
+        
+        conn = self.db.conn
+        try:
+            # Flush any implicit transaction so BEGIN IMMEDIATE starts cleanly
+            if conn.in_transaction:
+                conn.commit()
+            
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(INSERT_ANALYSIS_SQL, [self._analysis_row(a) for a in analyses])
+            conn.executemany(
+                "UPDATE emails SET ai_analyzed = TRUE WHERE id = ?",
+                [(a.email_id,) for a in analyses]
+            )
+            conn.commit()
+            self._analyzed_ids.update(a.email_id for a in analyses)
+            logger.info(f"💾 Stored {len(analyses)} analyses in one transaction")
+            
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ Failed to bulk store analyses: {e}")
+    
+    def _load_analyzed_ids(self) -> set:
+        """Load the ids of analyzed emails for fast existence checks"""
+        try:
+            self.db.cursor.execute("SELECT email_id FROM email_analysis")
+            return {row['email_id'] for row in self.db.cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"❌ Failed to load analyzed email ids: {e}")
+            return set()
+    
     def _is_already_analyzed(self, email_id: int) -> bool:
         """Check if email is already analyzed"""
+        # Not in the in-memory set means definitely not analyzed; a hit is
+        # confirmed against the table since rows can be deleted underneath us
+        if email_id not in self._analyzed_ids:
+            return False
+        
         self.db.cursor.execute(
             "SELECT 1 FROM email_analysis WHERE email_id = ?", (email_id,)
         )
@@ -369,8 +616,8 @@ Provide analysis in this exact JSON format:
                 sentiment=row['sentiment'],
                 draft_reply=row['draft_reply'],
                 action_required=bool(row['action_required']),
-                suggested_actions=json.loads(row['suggested_actions'] or '[]'),
-                key_topics=json.loads(row['key_topics'] or '[]'),
+                suggested_actions=orjson.loads(row['suggested_actions'] or '[]'),
+                key_topics=orjson.loads(row['key_topics'] or '[]'),
                 analysis_timestamp=row['analysis_timestamp'],
                 processing_time_ms=row['processing_time_ms']
             )
@@ -379,18 +626,8 @@ Provide analysis in this exact JSON format:
             logger.error(f"❌ Failed to get existing analysis: {e}")
             return None
     
-    def _mark_email_analyzed(self, email_id: int):
-        """Mark email as analyzed in emails table"""
-        try:
-            self.db.cursor.execute(
-                "UPDATE emails SET ai_analyzed = TRUE WHERE id = ?", (email_id,)
-            )
-            self.db.conn.commit()
-        except Exception as e:
-            logger.error(f"❌ Failed to mark email as analyzed: {e}")
-    
     def batch_analyze_emails(self, limit: int = 10) -> List[EmailAnalysis]:
-        """Analyze multiple emails in batch"""
+        """Analyze multiple emails in batch, running Gemini calls concurrently"""
         logger.info(f"🚀 Starting batch analysis of up to {limit} emails")
         
         # Get unanalyzed emails
@@ -400,26 +637,82 @@ Provide analysis in this exact JSON format:
             logger.info("📭 No unanalyzed emails found")
             return []
         
-        results = []
-        for i, email in enumerate(unanalyzed_emails, 1):
-            logger.info(f"📊 Processing {i}/{len(unanalyzed_emails)}")
-            
-            analysis = self.analyze_email(dict(email))
-            if analysis:
-                results.append(analysis)
-            
-            # Small delay to avoid rate limits
-            time.sleep(0.5)
+        results = run_async(
+            self._analyze_emails_concurrently([dict(email) for email in unanalyzed_emails])
+        )
+        
+        # One transaction for the whole batch instead of a commit per email
+        self._store_analyses_bulk(results)
         
         logger.info(f"✅ Batch analysis complete: {len(results)} emails analyzed")
         return results
     
+    async def _analyze_emails_concurrently(self, emails: List[Dict]) -> List[EmailAnalysis]:
+        """Analyze emails in prompt-sized chunks through the model's abatch under the Gemini rate limit"""
+        start_time = time.time()
+        email_contents = [self._prepare_email_content(email) for email in emails]
+        
+        # Serve near-duplicates from the semantic cache, batch-prompt the rest
+        embeddings = await asyncio.gather(*(self.semantic_cache.aembed(c) for c in email_contents))
+        results: List[Optional[Dict]] = [None] * len(emails)
+        pending = []
+        for i, embedding in enumerate(embeddings):
+            cached = self.semantic_cache.lookup(embedding)
+            if cached:
+                results[i] = self._validate_analysis_results(orjson.loads(cached))
+            else:
+                pending.append(i)
+        
+        chunks = [pending[i:i + EMAILS_PER_PROMPT] for i in range(0, len(pending), EMAILS_PER_PROMPT)]
+        fallback: Dict[int, Optional[EmailAnalysis]] = {}
+        
+        if chunks:
+            logger.info(f"📊 Sending {len(pending)} emails to Gemini in {len(chunks)} batched prompts")
+            prompts = [
+                self._build_batch_analysis_messages([email_contents[i] for i in chunk])
+                for chunk in chunks
+            ]
+            
+            responses = await self.batch_llm.abatch(
+                prompts,
+                config={'max_concurrency': BATCH_CONCURRENCY},
+                return_exceptions=True,
+            )
+            
+            retry = []
+            for chunk, response in zip(chunks, responses):
+                try:
+                    if isinstance(response, Exception):
+                        raise response
+                    batch_results = self._parse_batch_analysis_response(response.content, len(chunk))
+                    for i, analysis_results in zip(chunk, batch_results):
+                        results[i] = analysis_results
+                        self.semantic_cache.add(embeddings[i], orjson.dumps(analysis_results).decode())
+                except Exception as e:
+                    logger.warning(f"⚠️ Batched analysis failed ({e}), analyzing {len(chunk)} emails individually")
+                    retry.extend(chunk)
+            
+            if retry:
+                retried = await asyncio.gather(*(
+                    self.analyze_email_async(emails[i], persist=False, skip_dedup_check=True) for i in retry
+                ))
+                fallback = dict(zip(retry, retried))
+        
+        analyses = [
+            fallback[i] if i in fallback else self._save_analysis(email, results[i], start_time, persist=False)
+            for i, email in enumerate(emails)
+        ]
+        return [analysis for analysis in analyses if analysis]
+    
     def _get_unanalyzed_emails(self, limit: int) -> List:
         """Get emails that haven't been analyzed yet"""
+        # Anti-join on email_analysis rather than trusting the ai_analyzed flag,
+        # so the two can never drift apart
         self.db.cursor.execute("""
-            SELECT * FROM emails 
-            WHERE ai_analyzed IS NOT TRUE 
-            ORDER BY date DESC 
+            SELECT e.* FROM emails e
+            LEFT JOIN email_analysis a ON a.email_id = e.id
+            WHERE a.id IS NULL
+            ORDER BY e.date DESC 
             LIMIT ?
         """, (limit,))
         
@@ -437,75 +730,40 @@ Provide analysis in this exact JSON format:
             LIMIT ?
         """, (limit,))
         
-        results = []
-        for row in self.db.cursor.fetchall():
-            row_dict = dict(row)
-            row_dict['suggested_actions'] = json.loads(row_dict.get('suggested_actions', '[]'))
-            results.append(row_dict)
+        results = [dict(row) for row in self.db.cursor.fetchall()]
+        
+        # Decode every suggested_actions array with one parser call
+        combined = '[' + ','.join(r['suggested_actions'] or '[]' for r in results) + ']'
+        for row_dict, actions in zip(results, orjson.loads(combined)):
+            row_dict['suggested_actions'] = actions
         
         return results
     
     def get_analysis_stats(self) -> Dict:
-        """Get analysis statistics"""
+        """Get analysis statistics with a single aggregate query"""
         try:
-            # Total emails analyzed
-            self.db.cursor.execute("SELECT COUNT(*) as total FROM email_analysis")
-            total_analyzed = self.db.cursor.fetchone()['total']
-            
-            # Priority distribution
-            self.db.cursor.execute("""
-                SELECT priority_score, COUNT(*) as count 
-                FROM email_analysis 
-                GROUP BY priority_score
-            """)
-            priority_dist = {row['priority_score']: row['count'] 
-                           for row in self.db.cursor.fetchall()}
+            self.db.cursor.execute(ANALYSIS_STATS_SQL)
+            stats = orjson.loads(self.db.cursor.fetchone()['stats'])
             
-            # Sentiment distribution
-            self.db.cursor.execute("""
-                SELECT sentiment, COUNT(*) as count 
-                FROM email_analysis 
-                GROUP BY sentiment
-            """)
-            sentiment_dist = {row['sentiment']: row['count'] 
-                            for row in self.db.cursor.fetchall()}
-            
-            # Emails requiring action
-            self.db.cursor.execute("""
-                SELECT COUNT(*) as count 
-                FROM email_analysis 
-                WHERE action_required = 1
-            """)
-            action_required = self.db.cursor.fetchone()['count']
+            total_analyzed = stats['total']
+            total_emails = stats['emails']
+            completion_rate = round((total_analyzed / total_emails) * 100, 2) if total_emails else 0.0
             
             return {
                 'total_analyzed': total_analyzed,
-                'priority_distribution': priority_dist,
-                'sentiment_distribution': sentiment_dist,
-                'emails_requiring_action': action_required,
-                'analysis_completion_rate': self._get_analysis_completion_rate()
+                # JSON object keys are strings - restore integer priority scores
+                'priority_distribution': {int(score): count for score, count in stats['priority'].items()},
+                'sentiment_distribution': stats['sentiment'],
+                'emails_requiring_action': stats['action'],
+                'analysis_completion_rate': completion_rate
             }
             
         except Exception as e:
             logger.error(f"❌ Failed to get analysis stats: {e}")
             return {}
-    
-    def _get_analysis_completion_rate(self) -> float:
-        """Calculate percentage of emails that have been analyzed"""
-        try:
-            self.db.cursor.execute("SELECT COUNT(*) as total FROM emails")
-            total_emails = self.db.cursor.fetchone()['total']
-            
-            if total_emails == 0:
-                return 0.0
-            
-            self.db.cursor.execute("SELECT COUNT(*) as analyzed FROM email_analysis")
-            analyzed_emails = self.db.cursor.fetchone()['analyzed']
-            
-            return round((analyzed_emails / total_emails) * 100, 2)
-            
-        except Exception:
-            return 0.0
 
-# Singleton instance
-ai_analyzer = AIEmailAnalyzer()
\ No newline at end of file
+# Singleton instance, created on first use so importing this module stays cheap
+@lru_cache(maxsize=1)
+def get_ai_analyzer() -> AIEmailAnalyzer:
+    """Return the shared AIEmailAnalyzer, initializing it lazily"""
+    return AIEmailAnalyzer()
\ No newline at end of file
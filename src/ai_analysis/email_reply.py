@@ -1,15 +1,18 @@
 # src/ai_analysis/email_reply.py
 
 import base64
-import email.mime.text
-import email.mime.multipart
-from datetime import datetime
-from typing import Optional, Dict, List
+import asyncio
+import functools
+import hashlib
+from collections import OrderedDict
+from email.message import EmailMessage
+from types import MappingProxyType
+from typing import Optional, Dict, List, Tuple, Iterator, AsyncIterator, Mapping
 import re
 import json
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+import tiktoken
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from src.auth.gmail_auth import authenticate_gmail
@@ -17,21 +20,186 @@ from src.storage.sqlite_manager import SQLiteManager
 from langsmith import traceable
 
 from utils.logger import get_logger
+from utils.config_loader import config
+from utils.llm_client import get_chat_model, run_async
 
 logger = get_logger(__name__)   # name = "services.email_service"
 
+# Any run of whitespace, collapsed to a single space when cleaning email text
+_WS_RE = re.compile(r'\s+')
 
+# Sender parsing: address inside angle brackets and display name before them
+_SENDER_ANGLE_RE = re.compile(r'<([^>]+)>')
+_SENDER_NAME_RE = re.compile(r'^([^<]+)<')
+
+# Reply record statements; sent_timestamp is stamped by the database clock for sent replies
+_INSERT_REPLY_SQL = """
+    INSERT INTO email_replies 
+    (original_email_id, reply_gmail_id, reply_subject, reply_body, 
+     reply_type, sent_status, sent_timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, CASE WHEN ? = 'sent' THEN CURRENT_TIMESTAMP ELSE NULL END)
+"""
+
+_UPDATE_REPLY_STATUS_SQL = """
+    UPDATE email_replies 
+    SET sent_status = ?, sent_timestamp = CASE WHEN ? = 'sent' THEN CURRENT_TIMESTAMP ELSE NULL END 
+    WHERE id = ?
+"""
+
+# Gmail accepts at most 100 calls per batch HTTP request
+GMAIL_BATCH_LIMIT = 100
+
+# Max concurrent Gemini calls when generating replies for many emails
+REPLY_CONCURRENCY = 8
+
+# Reply types that are served by the fast model tier; everything else is 'standard'
+_REPLY_MODEL_TIERS = {'acknowledge': 'fast'}
+
+# Token budget for the email body in reply prompts: bodies over the limit keep
+# their head and tail verbatim and drop the middle
+BODY_TOKEN_LIMIT = 800
+BODY_HEAD_TOKENS = 500
+BODY_TAIL_TOKENS = 200
+
+# Generated replies are memoized by prompt hash: in memory (LRU) and in SQLite (TTL)
+REPLY_CACHE_SIZE = 512
+LLM_CACHE_TTL_HOURS = 24
+
+# Bodies longer than this (in characters) go through the prompt compressor when enabled
+COMPRESSION_MIN_CHARS = 2000
+COMPRESSION_RATE = 0.5
+
+CACHE_STATS_LOG_INTERVAL = 100
+
+
+# Module-level helpers, usable without an AIEmailReply instance
+
+def clean_html_content(html_content: str) -> str:
+    """Clean HTML content using selectolax (Lexbor)"""
+    if not html_content:
+        return ""
+    
+    try:
+        tree = LexborHTMLParser(html_content)
+        
+        # Remove script and style elements
+        for node in tree.css('script,style'):
+            node.decompose()
+        
+        text = tree.body.text(separator=' ') if tree.body else ''
+        
+        # Collapse whitespace runs and drop blank lines in one pass
+        return _WS_RE.sub(' ', text).strip()
+    except Exception as e:
+        logger.error(f"❌ Failed to clean HTML content: {e}")
+        return html_content
+
+
+def extract_email_address(sender: str) -> str:
+    """Extract email address from sender field"""
+    if not sender:
+        return ""
+    
+    # Extract email from "Name <email>" format
+    email_match = _SENDER_ANGLE_RE.search(sender)
+    if email_match:
+        return email_match.group(1)
+    
+    # If no brackets, assume the whole string is email
+    return sender.strip()
+
+
+def prepare_reply_message(email_data: Dict, reply_content: str) -> Dict:
+    """Prepare Gmail message format for reply"""
+    
+    # Extract sender email for reply-to
+    sender_email = extract_email_address(email_data.get('sender', ''))
+    
+    # Plain-text reply: a single-part message, 7bit when the content is ASCII
+    msg = EmailMessage()
+    msg['To'] = sender_email
+    msg['Subject'] = f"Re: {email_data.get('subject', '')}"
+    
+    # Add In-Reply-To and References headers if available
+    gmail_id = email_data.get('gmail_id')
+    if gmail_id:
+        msg['In-Reply-To'] = f"<{gmail_id}>"
+        msg['References'] = f"<{gmail_id}>"
+    
+    # Add body
+    msg.set_content(reply_content)
+    
+    # Encode message
+    raw_message = base64.urlsafe_b64encode(bytes(msg)).decode('utf-8')
+    
+    return {'raw': raw_message}
 
 
 class AIEmailReply:
     """AI-powered email reply system with draft generation and sending"""
     
+    # System prompts per reply type, built once at import time
+    _REPLY_PROMPTS: Mapping[str, str] = MappingProxyType({
+        'standard': """You are a professional email assistant. Generate a thoughtful, appropriate reply to the given email.
+
+Guidelines:
+- Be professional but warm
+- Address the main points from the original email
+- Keep it concise but complete
+- Use proper email etiquette
+- Match the tone of the original sender
+- Include next steps if applicable
+- Don't repeat information unnecessarily
+
+Generate only the email body, not subject line or signatures.""",
+        'acknowledge': """Generate a brief acknowledgment reply that confirms receipt and understanding.
+
+Guidelines:
+- Acknowledge receipt of the email
+- Confirm understanding of key points
+- Provide timeline if action is needed
+- Keep it short and professional
+- Express appreciation if appropriate""",
+        'decline': """Generate a polite decline/rejection email.
+
+Guidelines:
+- Be respectful and diplomatic
+- Provide a brief reason if appropriate
+- Thank them for the opportunity/request
+- Suggest alternatives if possible
+- Keep the door open for future opportunities
+- Be firm but kind""",
+        'request_info': """Generate a professional request for additional information.
+
+Guidelines:
+- Clearly state what information is needed
+- Explain why the information is important
+- Provide context about the request
+- Set a reasonable timeline
+- Make it easy for them to respond
+- Be specific about what you need""",
+        'follow_up': """Generate a follow-up email for previous communication.
+
+Guidelines:
+- Reference previous communication
+- Restate key points if needed
+- Be persistent but not pushy
+- Provide value or new information
+- Include clear call to action
+- Show understanding of their time constraints"""
+    })
+    
     def __init__(self):
         self.db = SQLiteManager()
         self.gmail_service = None
         self._setup_gmail_service()
         self._setup_ai_model()
         self._create_reply_tables()
+        self._encoding = self._load_encoding()
+        self._compressor = self._load_compressor() if config.ENABLE_PROMPT_COMPRESSION else None
+        self._reply_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._cache_lookups = 0
+        self._cache_hits = 0
     
     def _setup_gmail_service(self):
         """Initialize Gmail service for sending emails"""
@@ -45,17 +213,54 @@ class AIEmailReply:
     def _setup_ai_model(self):
         """Initialize AI model for reply generation"""
         try:
-            self.llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                temperature=0.3,  # Slightly higher for more creative replies
-                max_tokens=1024,
-                timeout=30,
-            )
+            self._llms = {
+                # Short, formulaic replies: smaller model and a tight output cap
+                'fast': get_chat_model(
+                    model="gemini-2.5-flash-lite",
+                    temperature=0.3,
+                    max_tokens=256,
+                    timeout=30,
+                ),
+                'standard': get_chat_model(
+                    model="gemini-2.5-flash",
+                    temperature=0.3,  # Slightly higher for more creative replies
+                    max_tokens=1024,
+                    timeout=30,
+                ),
+            }
+            self.llm = self._llms['standard']
             logger.info("✅ AI model for reply generation initialized")
         except Exception as e:
             logger.error(f"❌ Failed to initialize AI model: {e}")
             raise
     
+    def _get_llm(self, reply_type: str):
+        """Pick the model tier for a reply type"""
+        return self._llms[_REPLY_MODEL_TIERS.get(reply_type, 'standard')]
+    
+    def _load_encoding(self):
+        """Load the tokenizer used to budget prompt size"""
+        try:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"⚠️ Tokenizer unavailable, falling back to character truncation: {e}")
+            return None
+    
+    def _load_compressor(self):
+        """Load the optional LLMLingua-2 prompt compressor"""
+        try:
+            from llmlingua import PromptCompressor
+            compressor = PromptCompressor(
+                model_name="microsoft/llmlingua-2-xlm-roberta-large-meetingbank",
+                use_llmlingua2=True,
+                device_map="cpu",
+            )
+            logger.info("✅ Prompt compressor loaded")
+            return compressor
+        except Exception as e:
+            logger.warning(f"⚠️ Prompt compression disabled, compressor unavailable: {e}")
+            return None
+    
     def _create_reply_tables(self):
         """Create tables for tracking sent replies"""
         try:
@@ -80,6 +285,32 @@ class AIEmailReply:
                 ON email_replies(original_email_id);
             """)
             
+            # Serves get_replies_for_email pre-sorted, without a temp B-tree
+            self.db.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_replies_email_time 
+                ON email_replies(original_email_id, created_timestamp DESC);
+            """)
+            
+            self.db.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_replies_status_time 
+                ON email_replies(sent_status, sent_timestamp);
+            """)
+            
+            # Persistent cache of generated replies keyed by prompt hash
+            self.db.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key BLOB PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+            
+            # Sweep expired cache entries
+            self.db.cursor.execute(
+                "DELETE FROM llm_cache WHERE created < datetime('now', ?)",
+                (f"-{LLM_CACHE_TTL_HOURS} hours",)
+            )
+            
             self.db.conn.commit()
             logger.info("✅ Reply tracking tables created/verified")
             
@@ -87,8 +318,9 @@ class AIEmailReply:
             logger.error(f"❌ Failed to create reply tables: {e}")
     
     @traceable(name="generate_ai_reply")
-    def generate_ai_reply(self, email_data: Dict, reply_type: str = "standard") -> Optional[str]:
-        """Generate AI reply for an email"""
+    def generate_ai_reply(self, email_data: Dict, reply_type: str = "standard",
+                          use_cache: bool = True) -> Optional[str]:
+        """Generate AI reply for an email (use_cache=False forces a fresh generation)"""
         try:
             logger.info(f"🤖 Generating AI reply for email: {email_data.get('subject', '')[:50]}...")
             
@@ -99,7 +331,143 @@ class AIEmailReply:
             context = self._prepare_reply_context(email_data, analysis, reply_type)
             
             # Generate reply using AI
-            reply_content = self._generate_reply_content(context, reply_type)
+            reply_content = self._generate_reply_content(context, reply_type, use_cache)
+            
+            logger.info("✅ AI reply generated successfully")
+            return reply_content
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to generate AI reply: {e}")
+            return None
+    
+    @traceable(name="generate_ai_reply_all_types")
+    def generate_ai_reply_all_types(self, email_data: Dict,
+                                    reply_types: Optional[List[str]] = None) -> Dict[str, str]:
+        """Generate one reply variant per reply type with batched Gemini calls.
+
+        Returns a {reply_type: reply} mapping; failed variants get the fallback reply.
+        """
+        reply_types = reply_types or list(self._REPLY_PROMPTS)
+        logger.info(f"🤖 Generating {len(reply_types)} reply variants for email: {email_data.get('subject', '')[:50]}...")
+        
+        analysis = self._get_email_analysis(email_data['id'])
+        context = self._prepare_reply_context(email_data, analysis, reply_types[0])
+        # Clean the body once for every variant
+        context['original_email']['clean_body'] = self._clean_html_content(context['original_email']['body'])
+        
+        replies: Dict[str, str] = {}
+        pending: Dict[str, List[Tuple[str, bytes, List]]] = {}
+        for reply_type in reply_types:
+            context['reply_type'] = reply_type
+            messages = self._build_reply_messages(context, reply_type)
+            cache_key = self._reply_cache_key(messages)
+            
+            cached = self._get_cached_reply(cache_key)
+            if cached is not None:
+                replies[reply_type] = cached
+            else:
+                tier = _REPLY_MODEL_TIERS.get(reply_type, 'standard')
+                pending.setdefault(tier, []).append((reply_type, cache_key, messages))
+        
+        # One batch per model tier; LangChain runs the requests concurrently
+        for tier, requests in pending.items():
+            responses = self._llms[tier].batch(
+                [messages for _, _, messages in requests],
+                config={'max_concurrency': len(requests)},
+                return_exceptions=True
+            )
+            for (reply_type, cache_key, _), response in zip(requests, responses):
+                if isinstance(response, Exception):
+                    logger.error(f"❌ AI reply generation failed for '{reply_type}': {response}")
+                    replies[reply_type] = self._get_fallback_reply(context)
+                    continue
+                replies[reply_type] = response.content.strip()
+                self._store_cached_reply(cache_key, replies[reply_type])
+        
+        logger.info("✅ AI reply variants generated successfully")
+        return {reply_type: replies[reply_type] for reply_type in reply_types}
+    
+    def generate_ai_reply_stream(self, email_data: Dict, reply_type: str = "standard",
+                                 use_cache: bool = True) -> Iterator[str]:
+        """Generate an AI reply, yielding text chunks as Gemini produces them
+        
+        A cached reply is yielded whole; a completed stream is stored in the cache.
+        The fallback reply is only yielded if nothing was streamed before a failure.
+        """
+        context = None
+        chunks = []
+        try:
+            logger.info(f"🤖 Streaming AI reply for email: {email_data.get('subject', '')[:50]}...")
+            
+            analysis = self._get_email_analysis(email_data['id'])
+            context = self._prepare_reply_context(email_data, analysis, reply_type)
+            messages = self._build_reply_messages(context, reply_type)
+            cache_key = self._reply_cache_key(messages)
+            
+            if use_cache:
+                cached = self._get_cached_reply(cache_key)
+                if cached is not None:
+                    yield cached
+                    return
+            
+            for chunk in self._get_llm(reply_type).stream(messages):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield chunk.content
+            
+            self._store_cached_reply(cache_key, ''.join(chunks).strip())
+            logger.info("✅ AI reply streamed successfully")
+            
+        except Exception as e:
+            logger.error(f"❌ AI reply streaming failed: {e}")
+            # Appending the fallback to partial text would garble the reply
+            if context and not chunks:
+                yield self._get_fallback_reply(context)
+    
+    async def agenerate_ai_reply_stream(self, email_data: Dict, reply_type: str = "standard",
+                                        use_cache: bool = True) -> AsyncIterator[str]:
+        """Async variant of generate_ai_reply_stream using the model's astream"""
+        context = None
+        chunks = []
+        try:
+            analysis = self._get_email_analysis(email_data['id'])
+            context = self._prepare_reply_context(email_data, analysis, reply_type)
+            messages = self._build_reply_messages(context, reply_type)
+            cache_key = self._reply_cache_key(messages)
+            
+            if use_cache:
+                cached = self._get_cached_reply(cache_key)
+                if cached is not None:
+                    yield cached
+                    return
+            
+            async for chunk in self._get_llm(reply_type).astream(messages):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield chunk.content
+            
+            self._store_cached_reply(cache_key, ''.join(chunks).strip())
+            
+        except Exception as e:
+            logger.error(f"❌ AI reply streaming failed: {e}")
+            if context and not chunks:
+                yield self._get_fallback_reply(context)
+    
+    @traceable(name="agenerate_ai_reply")
+    async def agenerate_ai_reply(self, email_data: Dict, reply_type: str = "standard") -> Optional[str]:
+        """Async variant of generate_ai_reply using the model's ainvoke"""
+        try:
+            logger.info(f"🤖 Generating AI reply for email: {email_data.get('subject', '')[:50]}...")
+            
+            analysis = self._get_email_analysis(email_data['id'])
+            context = self._prepare_reply_context(email_data, analysis, reply_type)
+            
+            # A single body is too small to be worth a worker process - just keep it off the event loop
+            context['original_email']['clean_body'] = await asyncio.to_thread(
+                clean_html_content, context['original_email']['body']
+            )
+            
+            reply_content = await self._agenerate_reply_content(context, reply_type)
             
             logger.info("✅ AI reply generated successfully")
             return reply_content
@@ -108,10 +476,41 @@ class AIEmailReply:
             logger.error(f"❌ Failed to generate AI reply: {e}")
             return None
     
+    async def aprocess_inbox(self, emails: List[Dict], reply_type: str = "acknowledge",
+                             create_drafts: bool = True) -> List[Optional[str]]:
+        """Generate replies for many emails concurrently, optionally saving them as Gmail drafts.
+
+        Returns the generated reply (or None) for each email, in order.
+        """
+        semaphore = asyncio.Semaphore(REPLY_CONCURRENCY)
+        
+        async def generate(email_data: Dict) -> Optional[str]:
+            async with semaphore:
+                return await self.agenerate_ai_reply(email_data, reply_type)
+        
+        replies = await asyncio.gather(*(generate(email_data) for email_data in emails))
+        
+        if create_drafts:
+            items = [(email_data, reply) for email_data, reply in zip(emails, replies) if reply]
+            if items:
+                # Gmail client is blocking - keep it off the event loop
+                await asyncio.to_thread(self.create_reply_drafts_batch, items)
+        
+        return list(replies)
+    
+    def process_inbox(self, emails: List[Dict], reply_type: str = "acknowledge",
+                      create_drafts: bool = True) -> List[Optional[str]]:
+        """Synchronous wrapper around aprocess_inbox"""
+        return run_async(self.aprocess_inbox(emails, reply_type, create_drafts))
+    
     def _get_email_analysis(self, email_id: int) -> Optional[Dict]:
         """Get email analysis from database"""
         try:
-            self.db.cursor.execute("SELECT * FROM email_analysis WHERE email_id = ?", (email_id,))
+            self.db.cursor.execute("""
+                SELECT summary, priority_score, sentiment, action_required, 
+                       suggested_actions, key_topics 
+                FROM email_analysis WHERE email_id = ? LIMIT 1
+            """, (email_id,))
             row = self.db.cursor.fetchone()
             if row:
                 analysis = dict(row)
@@ -141,10 +540,10 @@ class AIEmailReply:
     
     def _extract_sender_info(self, sender: str) -> Dict:
         """Extract sender information from email address"""
-        email_match = re.search(r'<(.+?)>', sender)
+        email_match = _SENDER_ANGLE_RE.search(sender)
         email_addr = email_match.group(1) if email_match else sender
         
-        name_match = re.match(r'^([^<]+)<', sender.strip())
+        name_match = _SENDER_NAME_RE.match(sender.strip())
         name = name_match.group(1).strip().strip('"') if name_match else email_addr.split('@')[0]
         
         return {
@@ -153,101 +552,128 @@ class AIEmailReply:
             'domain': email_addr.split('@')[1] if '@' in email_addr else ''
         }
     
-    def _generate_reply_content(self, context: Dict, reply_type: str) -> str:
-        """Generate reply content using AI"""
-        
-        # Different prompts for different reply types
-        reply_prompts = {
-            'standard': self._get_standard_reply_prompt(),
-            'acknowledge': self._get_acknowledge_reply_prompt(),
-            'decline': self._get_decline_reply_prompt(),
-            'request_info': self._get_info_request_prompt(),
-            'follow_up': self._get_follow_up_prompt()
-        }
+    def _build_reply_messages(self, context: Dict, reply_type: str) -> List:
+        """Build the system/user messages for reply generation"""
         
-        system_prompt = reply_prompts.get(reply_type, reply_prompts['standard'])
+        system_prompt = self._REPLY_PROMPTS.get(reply_type, self._REPLY_PROMPTS['standard'])
         
         # Build user prompt with context
         user_prompt = self._build_user_prompt(context)
         
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+    
+    def _generate_reply_content(self, context: Dict, reply_type: str, use_cache: bool = True) -> str:
+        """Generate reply content using AI"""
         try:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
+            messages = self._build_reply_messages(context, reply_type)
+            cache_key = self._reply_cache_key(messages)
             
-            response = self.llm.invoke(messages)
-            return response.content.strip()
+            if use_cache:
+                cached = self._get_cached_reply(cache_key)
+                if cached is not None:
+                    return cached
+            
+            response = self._get_llm(reply_type).invoke(messages)
+            reply_content = response.content.strip()
+            self._store_cached_reply(cache_key, reply_content)
+            return reply_content
             
         except Exception as e:
             logger.error(f"❌ AI reply generation failed: {e}")
             return self._get_fallback_reply(context)
     
-    def _get_standard_reply_prompt(self) -> str:
-        return """You are a professional email assistant. Generate a thoughtful, appropriate reply to the given email.
-
-Guidelines:
-- Be professional but warm
-- Address the main points from the original email
-- Keep it concise but complete
-- Use proper email etiquette
-- Match the tone of the original sender
-- Include next steps if applicable
-- Don't repeat information unnecessarily
-
-Generate only the email body, not subject line or signatures."""
-
-    def _get_acknowledge_reply_prompt(self) -> str:
-        return """Generate a brief acknowledgment reply that confirms receipt and understanding.
-
-Guidelines:
-- Acknowledge receipt of the email
-- Confirm understanding of key points
-- Provide timeline if action is needed
-- Keep it short and professional
-- Express appreciation if appropriate"""
-
-    def _get_decline_reply_prompt(self) -> str:
-        return """Generate a polite decline/rejection email.
-
-Guidelines:
-- Be respectful and diplomatic
-- Provide a brief reason if appropriate
-- Thank them for the opportunity/request
-- Suggest alternatives if possible
-- Keep the door open for future opportunities
-- Be firm but kind"""
-
-    def _get_info_request_prompt(self) -> str:
-        return """Generate a professional request for additional information.
-
-Guidelines:
-- Clearly state what information is needed
-- Explain why the information is important
-- Provide context about the request
-- Set a reasonable timeline
-- Make it easy for them to respond
-- Be specific about what you need"""
-
-    def _get_follow_up_prompt(self) -> str:
-        return """Generate a follow-up email for previous communication.
-
-Guidelines:
-- Reference previous communication
-- Restate key points if needed
-- Be persistent but not pushy
-- Provide value or new information
-- Include clear call to action
-- Show understanding of their time constraints"""
-
+    async def _agenerate_reply_content(self, context: Dict, reply_type: str, use_cache: bool = True) -> str:
+        """Async variant of _generate_reply_content"""
+        try:
+            messages = self._build_reply_messages(context, reply_type)
+            cache_key = self._reply_cache_key(messages)
+            
+            if use_cache:
+                cached = self._get_cached_reply(cache_key)
+                if cached is not None:
+                    return cached
+            
+            response = await self._get_llm(reply_type).ainvoke(messages)
+            reply_content = response.content.strip()
+            self._store_cached_reply(cache_key, reply_content)
+            return reply_content
+            
+        except Exception as e:
+            logger.error(f"❌ AI reply generation failed: {e}")
+            return self._get_fallback_reply(context)
+    
+    def _reply_cache_key(self, messages: List) -> bytes:
+        """Content-addressed key for a system + user prompt pair"""
+        digest = hashlib.blake2b(digest_size=16)
+        for message in messages:
+            digest.update(message.content.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.digest()
+    
+    def _get_cached_reply(self, key: bytes) -> Optional[str]:
+        """Look a reply up in the in-memory LRU, then in the SQLite cache"""
+        self._cache_lookups += 1
+        reply = self._reply_cache.get(key)
+        
+        if reply is not None:
+            self._reply_cache.move_to_end(key)
+        else:
+            try:
+                self.db.cursor.execute(
+                    "SELECT response FROM llm_cache WHERE key = ? AND created >= datetime('now', ?)",
+                    (key, f"-{LLM_CACHE_TTL_HOURS} hours")
+                )
+                row = self.db.cursor.fetchone()
+                if row:
+                    reply = row['response']
+                    self._remember_reply(key, reply)
+            except Exception as e:
+                logger.warning(f"⚠️ Reply cache lookup failed: {e}")
+        
+        if reply is not None:
+            self._cache_hits += 1
+            logger.info("🎯 Reply served from cache")
+        
+        # Memoization only pays off with reuse - keep an eye on the hit rate
+        if self._cache_lookups % CACHE_STATS_LOG_INTERVAL == 0:
+            hit_rate = self._cache_hits / self._cache_lookups * 100
+            logger.info(f"📊 Reply cache hit rate: {hit_rate:.1f}% over {self._cache_lookups} lookups")
+        
+        return reply
+    
+    def _remember_reply(self, key: bytes, reply: str):
+        """Insert into the in-memory LRU, evicting the oldest entry when full"""
+        self._reply_cache[key] = reply
+        self._reply_cache.move_to_end(key)
+        if len(self._reply_cache) > REPLY_CACHE_SIZE:
+            self._reply_cache.popitem(last=False)
+    
+    def _store_cached_reply(self, key: bytes, reply: str):
+        """Store a generated reply in both cache tiers"""
+        self._remember_reply(key, reply)
+        try:
+            self.db.cursor.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created) VALUES (?, ?, CURRENT_TIMESTAMP)",
+                (key, reply)
+            )
+            self.db.conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to persist reply cache entry: {e}")
+    
     def _build_user_prompt(self, context: Dict) -> str:
         """Build user prompt with email context"""
         original = context['original_email']
         analysis = context.get('analysis', {})
         recipient = context['recipient_info']
         
-        # Clean HTML content using BeautifulSoup
-        body_text = self._clean_html_content(original['body'])
+        # Reuse the body cleaned upstream; otherwise strip its HTML with selectolax (Lexbor)
+        clean_body = original.get('clean_body')
+        if clean_body is None:
+            clean_body = self._clean_html_content(original['body'])
+        body_text = self._compress_body(clean_body)
         snippet_text = self._clean_html_content(original['snippet'])
         
         prompt = f"""
@@ -262,7 +688,7 @@ Recipient Information:
 - Domain: {recipient['domain']}
 
 Email Content:
-{body_text[:1500] if body_text else snippet_text}
+{self._truncate_to_token_budget(body_text) if body_text else snippet_text}
 
 """
         
@@ -284,34 +710,33 @@ Generate an appropriate reply email body based on the above context."""
 
         return prompt
     
-    def _clean_html_content(self, html_content: str) -> str:
-        """Clean HTML content using BeautifulSoup"""
-        if not html_content:
-            return ""
+    def _compress_body(self, text: str) -> str:
+        """Shrink long bodies with the prompt compressor when it is enabled"""
+        if not self._compressor or len(text) <= COMPRESSION_MIN_CHARS:
+            return text
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Get text and clean it up
-            text = soup.get_text()
-            
-            # Break into lines and remove leading and trailing space on each
-            lines = (line.strip() for line in text.splitlines())
-            
-            # Break multi-headlines into a line each
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            
-            # Drop blank lines
-            text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            return text
+            return self._compressor.compress_prompt(text, rate=COMPRESSION_RATE)['compressed_prompt']
         except Exception as e:
-            logger.error(f"❌ Failed to clean HTML content: {e}")
-            return html_content
+            logger.warning(f"⚠️ Prompt compression failed, using full body: {e}")
+            return text
+    
+    def _truncate_to_token_budget(self, text: str) -> str:
+        """Trim long bodies to their first/last tokens so the prompt stays within budget"""
+        if self._encoding is None:
+            return text[:1500]
+        
+        tokens = self._encoding.encode(text)
+        if len(tokens) <= BODY_TOKEN_LIMIT:
+            return text
+        
+        head = self._encoding.decode(tokens[:BODY_HEAD_TOKENS])
+        tail = self._encoding.decode(tokens[-BODY_TAIL_TOKENS:])
+        return f"{head} …[trimmed]… {tail}"
+    
+    def _clean_html_content(self, html_content: str) -> str:
+        """Clean HTML content using selectolax (Lexbor)"""
+        return clean_html_content(html_content)
     
     def _get_fallback_reply(self, context: Dict) -> str:
         """Provide fallback reply when AI fails"""
@@ -391,61 +816,126 @@ Best regards"""
             logger.error(f"❌ Failed to send reply: {e}")
             return None
     
-    def _prepare_reply_message(self, email_data: Dict, reply_content: str) -> Dict:
-        """Prepare Gmail message format for reply"""
+    def create_reply_drafts_batch(self, items: List[Tuple[Dict, str]],
+                                  reply_type: str = "ai_generated") -> List[Optional[int]]:
+        """Create many reply drafts using Gmail batch requests.
+
+        Returns one reply record id (or None on failure) per (email_data, reply_content) item.
+        """
+        requests = [
+            self.gmail_service.users().drafts().create(userId="me", body={"message": message})
+            for message in self._prepare_reply_messages(items)
+        ]
+        
+        succeeded, records = [], []
+        for index, ((email_data, reply_content), (response, error)) in enumerate(
+                zip(items, self._execute_gmail_batch(requests))):
+            if error:
+                logger.error(f"❌ Failed to create reply draft for email {email_data.get('id')}: {error}")
+                continue
+            
+            succeeded.append(index)
+            records.append((
+                email_data['id'],
+                response['message']['id'],
+                f"Re: {email_data.get('subject', '')}",
+                reply_content,
+                reply_type,
+                "draft",
+                "draft"
+            ))
+        
+        record_ids: List[Optional[int]] = [None] * len(items)
+        for index, record_id in zip(succeeded, self._store_reply_records_bulk(records)):
+            record_ids[index] = record_id
+        
+        logger.info(f"✅ Created {len(succeeded)}/{len(items)} reply drafts in batch")
+        return record_ids
+    
+    def send_replies_batch(self, items: List[Tuple[Dict, str]],
+                           reply_type: str = "ai_generated") -> List[Optional[int]]:
+        """Send many replies using Gmail batch requests.
+
+        Returns one reply record id (or None on failure) per (email_data, reply_content) item.
+        """
+        requests = [
+            self.gmail_service.users().messages().send(userId="me", body=message)
+            for message in self._prepare_reply_messages(items)
+        ]
+        
+        succeeded, records = [], []
+        for index, ((email_data, reply_content), (response, error)) in enumerate(
+                zip(items, self._execute_gmail_batch(requests))):
+            if error:
+                logger.error(f"❌ Failed to send reply for email {email_data.get('id')}: {error}")
+                continue
+            
+            succeeded.append(index)
+            records.append((
+                email_data['id'],
+                response['id'],
+                f"Re: {email_data.get('subject', '')}",
+                reply_content,
+                reply_type,
+                "sent",
+                "sent"
+            ))
         
-        # Extract sender email for reply-to
-        sender_email = self._extract_email_address(email_data.get('sender', ''))
+        # Mark the original emails as read in the same transaction as the reply records
+        read_ids = [items[index][0]['id'] for index in succeeded]
         
-        # Create MIME message
-        msg = email.mime.multipart.MIMEMultipart()
-        msg['To'] = sender_email
-        msg['Subject'] = f"Re: {email_data.get('subject', '')}"
+        record_ids: List[Optional[int]] = [None] * len(items)
+        for index, record_id in zip(succeeded, self._store_reply_records_bulk(records, read_ids)):
+            record_ids[index] = record_id
         
-        # Add In-Reply-To and References headers if available
-        gmail_id = email_data.get('gmail_id')
-        if gmail_id:
-            msg['In-Reply-To'] = f"<{gmail_id}>"
-            msg['References'] = f"<{gmail_id}>"
+        logger.info(f"✅ Sent {len(succeeded)}/{len(items)} replies in batch")
+        return record_ids
+    
+    def _execute_gmail_batch(self, requests: List) -> List[Tuple[Optional[Dict], Optional[Exception]]]:
+        """Execute Gmail API requests in batches of GMAIL_BATCH_LIMIT, preserving order"""
+        results: List[Tuple[Optional[Dict], Optional[Exception]]] = [(None, None)] * len(requests)
         
-        # Add body
-        msg.attach(email.mime.text.MIMEText(reply_content, 'plain', 'utf-8'))
+        def on_response(request_id, response, exception):
+            results[int(request_id)] = (response, exception)
         
-        # Encode message
-        raw_message = base64.urlsafe_b64encode(msg.as_bytes()).decode('utf-8')
+        for start in range(0, len(requests), GMAIL_BATCH_LIMIT):
+            batch = self.gmail_service.new_batch_http_request(callback=on_response)
+            for index, request in enumerate(requests[start:start + GMAIL_BATCH_LIMIT], start):
+                batch.add(request, request_id=str(index))
+            
+            try:
+                batch.execute()
+            except Exception as e:
+                # Whole HTTP call failed - mark every request of this chunk as failed
+                for index in range(start, min(start + GMAIL_BATCH_LIMIT, len(requests))):
+                    results[index] = (None, e)
         
-        return {'raw': raw_message}
+        return results
+    
+    def _prepare_reply_message(self, email_data: Dict, reply_content: str) -> Dict:
+        """Prepare Gmail message format for reply"""
+        return prepare_reply_message(email_data, reply_content)
+    
+    def _prepare_reply_messages(self, items: List[Tuple[Dict, str]]) -> List[Dict]:
+        """Prepare many reply messages (microseconds each, so inline beats any worker pool)"""
+        return [prepare_reply_message(email_data, reply_content) for email_data, reply_content in items]
     
     def _extract_email_address(self, sender: str) -> str:
         """Extract email address from sender field"""
-        if not sender:
-            return ""
-        
-        # Extract email from "Name <email>" format
-        email_match = re.search(r'<(.+?)>', sender)
-        if email_match:
-            return email_match.group(1)
-        
-        # If no brackets, assume the whole string is email
-        return sender.strip()
+        return extract_email_address(sender)
     
     def _store_reply_record(self, original_email_id: int, gmail_id: str, subject: str, 
                           body: str, reply_type: str, status: str) -> int:
         """Store reply record in database"""
         try:
-            self.db.cursor.execute("""
-                INSERT INTO email_replies 
-                (original_email_id, reply_gmail_id, reply_subject, reply_body, 
-                 reply_type, sent_status, sent_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+            self.db.cursor.execute(_INSERT_REPLY_SQL, (
                 original_email_id,
                 gmail_id,
                 subject,
                 body,
                 reply_type,
                 status,
-                datetime.now().isoformat() if status == "sent" else None
+                status
             ))
             
             reply_id = self.db.cursor.lastrowid
@@ -457,30 +947,61 @@ Best regards"""
             logger.error(f"❌ Failed to store reply record: {e}")
             return 0
     
+    def _store_reply_records_bulk(self, records: List[Tuple],
+                                  mark_read_ids: Optional[List[int]] = None) -> List[Optional[int]]:
+        """Store many reply records (and optionally mark emails read) in a single transaction.
+
+        Each record is (original_email_id, gmail_id, subject, body, reply_type, status, status);
+        the status is bound twice so the SQL can stamp sent replies.
+        Returns the new reply ids in record order.
+        """
+        if not records:
+            return []
+        
+        conn = self.db.conn
+        try:
+            if conn.in_transaction:
+                conn.commit()
+            
+            conn.execute("BEGIN")
+            self.db.cursor.executemany(_INSERT_REPLY_SQL, records)
+            
+            # AUTOINCREMENT ids within one transaction on one connection are consecutive
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            
+            if mark_read_ids:
+                self.db.cursor.executemany(
+                    "UPDATE emails SET is_read = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    [(email_id,) for email_id in mark_read_ids]
+                )
+            
+            conn.commit()
+            return list(range(last_id - len(records) + 1, last_id + 1))
+            
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ Failed to bulk store reply records: {e}")
+            return [None] * len(records)
+    
     def get_reply_stats(self) -> Dict:
         """Get reply statistics"""
         try:
-            # Total replies sent
-            self.db.cursor.execute("SELECT COUNT(*) as total FROM email_replies WHERE sent_status = 'sent'")
-            total_sent = self.db.cursor.fetchone()['total']
-            
-            # Total drafts created
-            self.db.cursor.execute("SELECT COUNT(*) as total FROM email_replies WHERE sent_status = 'draft'")
-            total_drafts = self.db.cursor.fetchone()['total']
+            # Status counts and 7-day activity in one scan
+            self.db.cursor.execute("""
+                SELECT
+                    COALESCE(SUM(sent_status = 'sent'), 0) AS total_sent,
+                    COALESCE(SUM(sent_status = 'draft'), 0) AS total_drafts,
+                    COALESCE(SUM(sent_status = 'sent' 
+                        AND datetime(sent_timestamp) >= datetime('now', '-7 days')), 0) AS recent_7d
+                FROM email_replies
+            """)
+            row = self.db.cursor.fetchone()
+            total_sent, total_drafts, recent_replies = row['total_sent'], row['total_drafts'], row['recent_7d']
             
             # AI generated vs manual
             self.db.cursor.execute("SELECT reply_type, COUNT(*) as count FROM email_replies GROUP BY reply_type")
             reply_type_dist = {row['reply_type']: row['count'] for row in self.db.cursor.fetchall()}
             
-            # Recent reply activity (last 7 days)
-            self.db.cursor.execute("""
-                SELECT COUNT(*) as count 
-                FROM email_replies 
-                WHERE sent_status = 'sent' 
-                AND datetime(sent_timestamp) >= datetime('now', '-7 days')
-            """)
-            recent_replies = self.db.cursor.fetchone()['count']
-            
             return {
                 'total_replies_sent': total_sent,
                 'total_drafts_created': total_drafts,
@@ -499,14 +1020,17 @@ Best regards"""
                 'total_replies': 0
             }
     
-    def get_replies_for_email(self, email_id: int) -> List[Dict]:
-        """Get all replies for a specific email"""
+    def get_replies_for_email(self, email_id: int, limit: int = 50) -> List[Dict]:
+        """Get the most recent replies for a specific email"""
         try:
             self.db.cursor.execute("""
-                SELECT * FROM email_replies 
+                SELECT id, reply_subject, reply_body, reply_type, sent_status, 
+                       sent_timestamp, created_timestamp 
+                FROM email_replies 
                 WHERE original_email_id = ? 
                 ORDER BY created_timestamp DESC
-            """, (email_id,))
+                LIMIT ?
+            """, (email_id, limit))
             
             return [dict(row) for row in self.db.cursor.fetchall()]
             
@@ -528,15 +1052,7 @@ Best regards"""
     def update_reply_status(self, reply_id: int, new_status: str) -> bool:
         """Update reply status (e.g., from draft to sent)"""
         try:
-            self.db.cursor.execute("""
-                UPDATE email_replies 
-                SET sent_status = ?, sent_timestamp = ? 
-                WHERE id = ?
-            """, (
-                new_status,
-                datetime.now().isoformat() if new_status == "sent" else None,
-                reply_id
-            ))
+            self.db.cursor.execute(_UPDATE_REPLY_STATUS_SQL, (new_status, new_status, reply_id))
             
             self.db.conn.commit()
             return self.db.cursor.rowcount > 0
@@ -545,5 +1061,8 @@ Best regards"""
             logger.error(f"❌ Failed to update reply status {reply_id}: {e}")
             return False
 
-# Singleton instance
-email_reply_system = AIEmailReply()
\ No newline at end of file
+# Singleton instance, created on first use so importing this module needs no Gmail credentials
+@functools.cache
+def get_email_reply_system() -> AIEmailReply:
+    """Return the shared AIEmailReply, initializing it lazily"""
+    return AIEmailReply()
\ No newline at end of file
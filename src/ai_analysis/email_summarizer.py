@@ -1,28 +1,195 @@
 # src/ai_analysis/email_summarizer.py
 
-import os
-import json
+import re
+import math
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
-from bs4 import BeautifulSoup
-
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
-from langchain_core.prompts.chat import SystemMessagePromptTemplate, HumanMessagePromptTemplate
+import queue
+import orjson
+import operator
+import asyncio
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+from dataclasses import dataclass
+from selectolax.lexbor import LexborHTMLParser
+
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.output_parsers import JsonOutputParser, PydanticOutputParser
 from langchain.schema import BaseOutputParser
-import logging
-from langsmith import traceable
 
+# langsmith tracing is optional - without it the decorator is a no-op
+try:
+    from langsmith import traceable
+except ImportError:
+    def traceable(**kwargs):
+        return lambda func: func
 
-from src.storage.sqlite_manager import SQLiteManager
+from src.storage.sqlite_manager import SQLiteManager, DB_PATH
 from utils.logger import get_logger
 
+# Heavy modules (BeautifulSoup, the Gemini client, numpy via the semantic
+# cache) are imported where they're first used, so read-only paths like
+# stats and summary listing don't pay for them
+if TYPE_CHECKING:
+    from utils.caching import SemanticCache
+
 logger = get_logger(__name__)   # name = "services.email_service"
 
+# Any run of whitespace, collapsed to a single space when cleaning email text
+_WS_RE = re.compile(r'\s+')
+
+# Sentence boundaries and word tokens for extractive content trimming
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Structured-text summary parsing: list bullets and section headers
+_BULLETS = ('-', '•', '*')
+_SECTION_RE = re.compile(
+    r'^[#*\s]*(brief summary|detailed summary|key points|action items|important dates|mentioned people)[*\s]*:',
+    re.IGNORECASE
+)
+
+# Emails with fewer words than this (ignoring any unsubscribe footer) are
+# summarized from their own text without an LLM call
+MIN_SUMMARY_WORDS = 30
+_UNSUBSCRIBE_RE = re.compile(
+    r'\b(unsubscribe|opt[ -]out|manage (?:your )?(?:email )?preferences|'
+    r'you (?:are|were) receiving this (?:email|message))\b',
+    re.IGNORECASE
+)
+
+# Max characters of email content sent to the model
+CONTENT_CHAR_LIMIT = 3000
+
+# Max items kept per list field, and max characters per item/string field
+SUMMARY_LIST_LIMITS = {
+    'key_points': 10,
+    'action_items': 10,
+    'important_dates': 10,
+    'mentioned_people': 20,
+}
+SUMMARY_ITEM_MAX_CHARS = 200
+BRIEF_SUMMARY_MAX_CHARS = 500
+DETAILED_SUMMARY_MAX_CHARS = 1500
+
+# System prompt for detailed summaries
+SUMMARY_SYSTEM_PROMPT = """You are an expert email summarization AI assistant. Your role is to create clear,
+concise, and actionable summaries of email content.
+
+Your capabilities include:
+- Extracting key information and main points
+- Identifying action items and deadlines
+- Recognizing important people and dates
+- Creating both brief and detailed summaries
+- Maintaining professional tone and accuracy
+
+Guidelines:
+- Focus on actionable information
+- Preserve important context and nuance
+- Use clear, professional language
+- Extract specific dates, names, and numbers accurately
+- Identify urgent or time-sensitive items
+- Maintain the sender's intent and tone"""
+
+# System prompt for the lighter summary types
+SIMPLE_SYSTEM_PROMPT = "You are an expert email summarization assistant."
+
+# Style guidance per summary type for the single-call multi-type prompt
+SUMMARY_STYLE_GUIDES = {
+    'brief': "max 2-3 sentences capturing the main purpose and any urgent actions",
+    'detailed': "comprehensive summary with structured key points, actions, dates and people",
+    'bullet_points': "clear, scannable bullet points of the key points, actions and dates",
+    'executive': "leadership-level view: business impact, decisions needed, risks and next steps",
+}
+
+MULTI_SUMMARY_TEMPLATE = """Summarize this email in several styles at once:
+
+From: {sender}
+Subject: {subject}
+Date: {date}
+
+Email Content:
+{email_content}
+
+Produce one summary per style:
+{styles}
+
+Return ONLY a JSON object keyed by style name, where each value has this shape:
+{{
+    "brief_summary": "2-3 sentence overview",
+    "detailed_summary": "Paragraph summary written in that style",
+    "key_points": ["point 1", "point 2"],
+    "action_items": ["action 1"],
+    "important_dates": ["date 1"],
+    "mentioned_people": ["person 1"]
+}}"""
+
+# Cosine similarity above which a cached summary is reused for a near-duplicate email
+SUMMARY_CACHE_THRESHOLD = 0.85
+
+# Background writer: max summaries per transaction, and how long to wait for more
+WRITE_BATCH_SIZE = 32
+WRITE_DRAIN_TIMEOUT_SECONDS = 0.1
+
+# Max in-flight Gemini calls during batch summarization
+SUMMARY_CONCURRENCY = 8
+
+# Gemini Batch API settings for offline batch summarization
+BATCH_API_MODEL = "models/gemini-2.5-flash"
+BATCH_POLL_INTERVAL_SECONDS = 30
+BATCH_JOB_TIMEOUT_SECONDS = 6 * 3600
+BATCH_DONE_STATES = {'JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED'}
+
+SUMMARY_STATS_SQL = """
+    SELECT json_object(
+        'total', (SELECT COUNT(DISTINCT email_id) FROM email_summaries),
+        'types', json((SELECT json_group_object(summary_type, cnt) FROM (
+            SELECT summary_type, COUNT(*) AS cnt FROM email_summaries GROUP BY summary_type))),
+        'avg_compression', (SELECT AVG(compression_ratio) FROM email_summaries),
+        'avg_time', (SELECT AVG(processing_time_ms) FROM email_summaries),
+        'with_actions', (SELECT COUNT(*) FROM email_summaries WHERE json_array_length(action_items) > 0),
+        'emails', (SELECT COUNT(*) FROM emails)
+    ) AS stats
+"""
+
+# SQLite 3.45+ stores the list columns as binary JSONB; older versions keep JSON text.
+# Reads always go through json() so callers get JSON text either way.
+JSONB_SUPPORTED = sqlite3.sqlite_version_info >= (3, 45, 0)
+_JSON_PARAM = "jsonb(?)" if JSONB_SUPPORTED else "?"
+
+INSERT_SUMMARY_SQL = f"""
+    INSERT OR REPLACE INTO email_summaries 
+    (email_id, gmail_id, brief_summary, detailed_summary, key_points, 
+     action_items, important_dates, mentioned_people, summary_type,
+     word_count_original, word_count_summary, compression_ratio,
+     summary_timestamp, processing_time_ms)
+    VALUES (?, ?, ?, ?, {_JSON_PARAM}, {_JSON_PARAM}, {_JSON_PARAM}, {_JSON_PARAM}, ?, ?, ?, ?, ?, ?)
+"""
+
+# Column order of INSERT_SUMMARY_SQL; rows are pulled off EmailSummary with one
+# precomputed attrgetter and the list fields are JSON-encoded in place
+_SUMMARY_ROW_FIELDS = (
+    'email_id', 'gmail_id', 'brief_summary', 'detailed_summary',
+    'key_points', 'action_items', 'important_dates', 'mentioned_people',
+    'summary_type', 'word_count_original', 'word_count_summary', 'compression_ratio',
+    'summary_timestamp', 'processing_time_ms',
+)
+_GET_SUMMARY_ROW = operator.attrgetter(*_SUMMARY_ROW_FIELDS)
+_JSON_ROW_INDEXES = (4, 5, 6, 7)
+
+# Bound with the (clean_body, word_count_original, email_id) rows _prepare_email_content leaves behind
+UPDATE_CLEAN_BODY_SQL = "UPDATE emails SET clean_body = ?, word_count_original = ? WHERE id = ?"
+
+SUMMARY_COLUMNS_SQL = """
+    id, email_id, gmail_id, brief_summary, detailed_summary,
+    json(key_points) AS key_points, json(action_items) AS action_items,
+    json(important_dates) AS important_dates, json(mentioned_people) AS mentioned_people,
+    summary_type, word_count_original, word_count_summary, compression_ratio,
+    summary_timestamp, processing_time_ms
+"""
+
 
 @dataclass
 class EmailSummary:
@@ -42,15 +209,36 @@ class EmailSummary:
     summary_timestamp: str
     processing_time_ms: int
 
+def _bounded_list(items, limit: int) -> List[str]:
+    """Stringify, truncate and cap list items in a single pass"""
+    result = []
+    if not isinstance(items, list):
+        return result
+    for item in items:
+        if item:
+            result.append(str(item)[:SUMMARY_ITEM_MAX_CHARS])
+            if len(result) >= limit:
+                break
+    return result
+
 class EmailSummaryOutputParser(BaseOutputParser):
-    """Custom output parser for email summaries"""
+    """Custom output parser for email summaries
+    
+    Parsing and validation happen together: list fields are built at their
+    final size and string fields truncated as the result is assembled.
+    """
     
     def parse(self, text: str) -> Dict:
         """Parse AI response to extract summary components"""
         try:
             # Try to parse as JSON first
-            if text.strip().startswith('{') and text.strip().endswith('}'):
-                return json.loads(text)
+            try:
+                data = orjson.loads(text)
+            except orjson.JSONDecodeError:
+                data = None
+            
+            if isinstance(data, dict):
+                return self.from_dict(data)
             
             # If not JSON, parse structured text
             lines = text.strip().split('\n')
@@ -69,42 +257,63 @@ class EmailSummaryOutputParser(BaseOutputParser):
                 if not line:
                     continue
                 
-                # Identify sections
-                if 'brief summary:' in line.lower():
-                    current_section = 'brief_summary'
-                    result['brief_summary'] = line.split(':', 1)[1].strip()
-                elif 'detailed summary:' in line.lower():
-                    current_section = 'detailed_summary'
-                    result['detailed_summary'] = line.split(':', 1)[1].strip()
-                elif 'key points:' in line.lower():
-                    current_section = 'key_points'
-                elif 'action items:' in line.lower():
-                    current_section = 'action_items'
-                elif 'important dates:' in line.lower():
-                    current_section = 'important_dates'
-                elif 'mentioned people:' in line.lower():
-                    current_section = 'mentioned_people'
-                elif line.startswith('-') or line.startswith('•') or line.startswith('*'):
-                    # List item
+                # Identify sections with one anchored match (tolerates markdown '#'/'**')
+                section = _SECTION_RE.match(line)
+                if section:
+                    current_section = section.group(1).lower().replace(' ', '_')
+                    if isinstance(result[current_section], str):
+                        result[current_section] = line[section.end():].strip(' *')
+                elif line.startswith(_BULLETS):
+                    # List item - skip once the section is full
                     item = line[1:].strip()
-                    if current_section and isinstance(result[current_section], list):
-                        result[current_section].append(item)
+                    if current_section in SUMMARY_LIST_LIMITS and item \
+                            and len(result[current_section]) < SUMMARY_LIST_LIMITS[current_section]:
+                        result[current_section].append(item[:SUMMARY_ITEM_MAX_CHARS])
                 elif current_section and isinstance(result[current_section], str):
                     # Continue adding to string fields
                     result[current_section] += ' ' + line
             
+            result['brief_summary'] = result['brief_summary'][:BRIEF_SUMMARY_MAX_CHARS]
+            result['detailed_summary'] = result['detailed_summary'][:DETAILED_SUMMARY_MAX_CHARS]
             return result
             
         except Exception as e:
             logger.error(f"❌ Failed to parse summary output: {e}")
             return {
                 'brief_summary': text[:200] + '...' if len(text) > 200 else text,
-                'detailed_summary': text,
+                'detailed_summary': text[:DETAILED_SUMMARY_MAX_CHARS],
                 'key_points': [],
                 'action_items': [],
                 'important_dates': [],
                 'mentioned_people': []
             }
+    
+    def from_dict(self, data: Dict) -> Dict:
+        """Validate an already-decoded summary object"""
+        result = {
+            'brief_summary': str(data.get('brief_summary', 'Summary not available'))[:BRIEF_SUMMARY_MAX_CHARS],
+            'detailed_summary': str(data.get('detailed_summary', 'Detailed summary not available'))[:DETAILED_SUMMARY_MAX_CHARS],
+        }
+        for key, limit in SUMMARY_LIST_LIMITS.items():
+            result[key] = _bounded_list(data.get(key, []), limit)
+        return result
+    
+    def parse_multi(self, text: str) -> Dict[str, Dict]:
+        """Parse a multi-type response ({summary_type: summary object}) into validated summaries"""
+        # Tolerate code fences or chatter around the JSON object
+        start, end = text.find('{'), text.rfind('}')
+        if start == -1 or end <= start:
+            return {}
+        
+        try:
+            data = orjson.loads(text[start:end + 1])
+        except orjson.JSONDecodeError as e:
+            logger.error(f"❌ Failed to parse multi-summary output: {e}")
+            return {}
+        
+        if not isinstance(data, dict):
+            return {}
+        return {key: self.from_dict(value) for key, value in data.items() if isinstance(value, dict)}
 
 class AIEmailSummarizer:
     """AI-powered email summarization using LangChain with advanced prompt templates"""
@@ -115,45 +324,36 @@ class AIEmailSummarizer:
         self._setup_prompt_templates()
         self._create_summary_tables()
         self.output_parser = EmailSummaryOutputParser()
+        self._semantic_caches: Dict[str, "SemanticCache"] = {}
+        
+        # Interactive summaries are persisted by a single background writer so
+        # the SQLite commit stays off the user-visible path
+        self._write_queue: queue.Queue = queue.Queue()
+        threading.Thread(target=self._writer_loop, name="summary-writer", daemon=True).start()
         
     def _setup_ai_model(self):
         """Initialize Gemini 2.5 Flash model with LangChain"""
         try:
-            self.llm = ChatGoogleGenerativeAI(
+            from utils.llm_client import get_chat_model
+            
+            # Shared client: reuses the long-lived gRPC channel (and its TLS
+            # session) already opened by the analyzer/reply components
+            self.llm = get_chat_model(
                 model="gemini-2.5-flash",
                 temperature=0.1,  # Low temperature for consistent summaries
                 max_tokens=2048,
                 timeout=30,
                 max_retries=3,
             )
-            logger.info("✅ Gemini 2.0 Flash model initialized for summarization")
+            self._genai_client = None
+            logger.info("✅ Gemini 2.5 Flash model initialized for summarization")
         except Exception as e:
             logger.error(f"❌ Failed to initialize Gemini model: {e}")
             raise
     
     def _setup_prompt_templates(self):
         """Setup advanced prompt templates for different summary types"""
-        
-        # System message template
-        self.system_template = SystemMessagePromptTemplate.from_template(
-            """You are an expert email summarization AI assistant. Your role is to create clear, 
-            concise, and actionable summaries of email content.
-
-            Your capabilities include:
-            - Extracting key information and main points
-            - Identifying action items and deadlines
-            - Recognizing important people and dates
-            - Creating both brief and detailed summaries
-            - Maintaining professional tone and accuracy
-
-            Guidelines:
-            - Focus on actionable information
-            - Preserve important context and nuance
-            - Use clear, professional language
-            - Extract specific dates, names, and numbers accurately
-            - Identify urgent or time-sensitive items
-            - Maintain the sender's intent and tone"""
-        )
+        from langchain_core.prompts import PromptTemplate
         
         # Different summary type templates
         self.summary_templates = {
@@ -243,11 +443,9 @@ class AIEmailSummarizer:
             )
         }
         
-        # Create chat prompt template
-        self.chat_template = ChatPromptTemplate.from_messages([
-            self.system_template,
-            HumanMessagePromptTemplate.from_template("{user_input}")
-        ])
+        # Keep the raw template strings so prompts are rendered with plain
+        # str.format instead of going through PromptTemplate on every email
+        self._raw_templates = {name: tmpl.template for name, tmpl in self.summary_templates.items()}
         
         logger.info("✅ Advanced prompt templates configured")
     
@@ -286,6 +484,19 @@ class AIEmailSummarizer:
                 # Column probably already exists
                 pass
             
+            # Cleaned body text and its word count, materialized once per email
+            # so repeat summaries (any type) skip HTML parsing entirely
+            for column_sql in ("ADD COLUMN clean_body TEXT", "ADD COLUMN word_count_original INTEGER"):
+                try:
+                    self.db.cursor.execute(f"ALTER TABLE emails {column_sql};")
+                except Exception:
+                    # Column probably already exists
+                    pass
+            
+            # UNIQUE(email_id, summary_type) already gives an index for the per-email
+            # lookups; summary_type-only filters and group-bys need their own
+            self.db.cursor.execute("CREATE INDEX IF NOT EXISTS idx_summaries_type ON email_summaries(summary_type, email_id);")
+            
             self.db.conn.commit()
             logger.info("✅ AI summarization tables created/verified")
             
@@ -296,14 +507,17 @@ class AIEmailSummarizer:
 
     @traceable(name="summarize_single_email")
 
-    def summarize_email(self, email_data: Dict, summary_type: str = "detailed") -> Optional[EmailSummary]:
-        """Summarize a single email with specified type"""
+    def summarize_email(self, email_data: Dict, summary_type: str = "detailed",
+                        on_chunk: Optional[Callable[[str], None]] = None) -> Optional[EmailSummary]:
+        """Summarize a single email with specified type
+        
+        on_chunk, if given, receives the raw model output as it streams in.
+        """
         start_time = time.time()
         
         try:
             email_id = email_data.get('id')
-            gmail_id = email_data.get('gmail_id', email_data.get('id', ''))
-            
+
             logger.info(f"📝 Summarizing email {email_id} ({summary_type}): {email_data.get('subject', '')[:50]}...")
             
             # Check if already summarized with this type
@@ -311,179 +525,438 @@ class AIEmailSummarizer:
                 logger.info(f"⏭️ Email {email_id} already summarized ({summary_type}), retrieving existing")
                 return self._get_existing_summary(email_id, summary_type)
             
-            # Prepare email content for summarization
-            email_content = self._prepare_email_content(email_data)
+            # Generate summary using AI
+            summary_results = self._generate_summary(email_data, summary_type, on_chunk)
             
-            # Count original words
-            word_count_original = len(email_content.split())
+            summary = self._build_summary(email_data, summary_type, summary_results, start_time)
+            self._store_clean_body(email_data)
             
-            # Generate summary using AI
-            summary_results = self._generate_summary(email_data, summary_type)
-            
-            # Count summary words
-            all_summary_text = ' '.join([
-                summary_results.get('brief_summary', ''),
-                summary_results.get('detailed_summary', ''),
-                ' '.join(summary_results.get('key_points', [])),
-                ' '.join(summary_results.get('action_items', []))
-            ])
-            word_count_summary = len(all_summary_text.split())
-            
-            # Calculate compression ratio
-            compression_ratio = round((word_count_summary / word_count_original * 100), 2) if word_count_original > 0 else 0
-            
-            # Create summary object
-            processing_time = int((time.time() - start_time) * 1000)
-            
-            summary = EmailSummary(
-                email_id=email_id,
-                gmail_id=gmail_id,
-                brief_summary=summary_results.get('brief_summary', ''),
-                detailed_summary=summary_results.get('detailed_summary', ''),
-                key_points=summary_results.get('key_points', []),
-                action_items=summary_results.get('action_items', []),
-                important_dates=summary_results.get('important_dates', []),
-                mentioned_people=summary_results.get('mentioned_people', []),
-                summary_type=summary_type,
-                word_count_original=word_count_original,
-                word_count_summary=word_count_summary,
-                compression_ratio=compression_ratio,
-                summary_timestamp=datetime.now().isoformat(),
-                processing_time_ms=processing_time
+            # Hand the summary to the background writer instead of committing inline
+            self._write_queue.put(summary)
+            
+            logger.info(f"✅ Email {email_id} summarized successfully in {summary.processing_time_ms}ms (compression: {summary.compression_ratio}%)")
+            return summary
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to summarize email {email_data.get('id')}: {e}")
+            return None
+    
+    def summarize_email_stream(self, email_data: Dict, summary_type: str = "detailed") -> Iterator[str]:
+        """Summarize a single email, yielding the model output as it streams in
+        
+        The summary is still parsed and stored once the stream completes.
+        """
+        chunks = queue.Queue()
+        done = object()
+        result = {}
+        
+        def run():
+            try:
+                result['summary'] = self.summarize_email(email_data, summary_type, on_chunk=chunks.put)
+            finally:
+                chunks.put(done)
+        
+        threading.Thread(target=run, daemon=True).start()
+        
+        streamed = False
+        while (chunk := chunks.get()) is not done:
+            streamed = True
+            yield chunk
+        
+        # Cached or already-stored summaries produce no stream - yield the stored text
+        summary = result.get('summary')
+        if not streamed and summary:
+            yield summary.detailed_summary or summary.brief_summary
+    
+    @traceable(name="summarize_email_multi")
+    def summarize_email_multi(self, email_data: Dict,
+                              types: Optional[List[str]] = None) -> List[EmailSummary]:
+        """Summarize one email in several summary types with a single Gemini call"""
+        start_time = time.time()
+        types = [t for t in (types or ['brief', 'detailed', 'bullet_points']) if t in self.summary_templates]
+        email_id = email_data.get('id')
+        
+        try:
+            logger.info(f"📝 Summarizing email {email_id} ({', '.join(types)}): {email_data.get('subject', '')[:50]}...")
+            
+            # Reuse any types that already exist; only the rest go to the model
+            summaries, pending = [], []
+            for summary_type in types:
+                existing = self._get_existing_summary(email_id, summary_type) \
+                    if self._is_already_summarized(email_id, summary_type) else None
+                if existing:
+                    summaries.append(existing)
+                else:
+                    pending.append(summary_type)
+            
+            if not pending:
+                return summaries
+            
+            trivial = self._get_trivial_summary(email_data)
+            if trivial:
+                new_summaries = [self._build_summary(email_data, t, trivial, start_time) for t in pending]
+                self._store_clean_body(email_data)
+                for summary in new_summaries:
+                    self._write_queue.put(summary)
+                return summaries + new_summaries
+            
+            prompt = MULTI_SUMMARY_TEMPLATE.format(
+                email_content=self._prepare_email_content(email_data),
+                sender=email_data.get('sender', 'Unknown'),
+                subject=email_data.get('subject', 'No Subject'),
+                date=email_data.get('date', ''),
+                styles='\n'.join(f'- "{t}": {SUMMARY_STYLE_GUIDES[t]}' for t in pending)
             )
+            response = self.llm.invoke([
+                SystemMessage(content=SUMMARY_SYSTEM_PROMPT),
+                HumanMessage(content=prompt)
+            ])
+            parsed = self.output_parser.parse_multi(response.content)
             
-            # Store in database
-            self._store_summary(summary)
+            # Fan the single response out into one summary per type
+            new_summaries = [
+                self._build_summary(
+                    email_data, summary_type,
+                    parsed.get(summary_type) or self._get_fallback_summary(email_data),
+                    start_time
+                )
+                for summary_type in pending
+            ]
+            self._store_clean_body(email_data)
+            for summary in new_summaries:
+                self._write_queue.put(summary)
             
-            # Mark email as summarized
-            self._mark_email_summarized(email_id)
+            logger.info(f"✅ Email {email_id} summarized in {len(pending)} types with one call")
+            return summaries + new_summaries
             
-            logger.info(f"✅ Email {email_id} summarized successfully in {processing_time}ms (compression: {compression_ratio}%)")
-            return summary
+        except Exception as e:
+            logger.error(f"❌ Failed to summarize email {email_id} in multiple types: {e}")
+            return []
+    
+    async def _summarize_email_async(self, email_data: Dict, summary_type: str = "detailed") -> Optional[EmailSummary]:
+        """Async variant of summarize_email - builds the summary but leaves storing to the caller
+        
+        Callers are expected to have skipped emails that already have a summary.
+        """
+        start_time = time.time()
+        
+        try:
+            summary_results = await self._agenerate_summary(email_data, summary_type)
+            return self._build_summary(email_data, summary_type, summary_results, start_time)
             
         except Exception as e:
             logger.error(f"❌ Failed to summarize email {email_data.get('id')}: {e}")
             return None
     
+    def _build_summary(self, email_data: Dict, summary_type: str, summary_results: Dict,
+                       start_time: float) -> EmailSummary:
+        """Assemble an EmailSummary with word counts and timing from the AI results"""
+        # Count original words (materialized alongside the cleaned body)
+        self._prepare_email_content(email_data)
+        word_count_original = email_data['word_count_original']
+        
+        # Count summary words
+        all_summary_text = ' '.join([
+            summary_results.get('brief_summary', ''),
+            summary_results.get('detailed_summary', ''),
+            ' '.join(summary_results.get('key_points', [])),
+            ' '.join(summary_results.get('action_items', []))
+        ])
+        word_count_summary = len(all_summary_text.split())
+        
+        # Calculate compression ratio
+        compression_ratio = round((word_count_summary / word_count_original * 100), 2) if word_count_original > 0 else 0
+        
+        processing_time = int((time.time() - start_time) * 1000)
+        
+        return EmailSummary(
+            email_id=email_data.get('id'),
+            gmail_id=email_data.get('gmail_id', email_data.get('id', '')),
+            brief_summary=summary_results.get('brief_summary', ''),
+            detailed_summary=summary_results.get('detailed_summary', ''),
+            key_points=summary_results.get('key_points', []),
+            action_items=summary_results.get('action_items', []),
+            important_dates=summary_results.get('important_dates', []),
+            mentioned_people=summary_results.get('mentioned_people', []),
+            summary_type=summary_type,
+            word_count_original=word_count_original,
+            word_count_summary=word_count_summary,
+            compression_ratio=compression_ratio,
+            summary_timestamp=datetime.now().isoformat(),
+            processing_time_ms=processing_time
+        )
+    
     def _prepare_email_content(self, email_data: Dict) -> str:
-        """Prepare email content for summarization with HTML cleaning"""
-        body = email_data.get('body', '')
-        snippet = email_data.get('snippet', '')
+        """Prepare email content for summarization with HTML cleaning
+        
+        The cleaned text and word count are cached on the emails row (and on
+        email_data) the first time, so later calls don't re-parse the HTML.
+        A freshly cleaned body is left on email_data as clean_body_row for the
+        caller to persist, so batches write them in their summaries' transaction.
+        The trimmed text is kept on email_data too, so TF-IDF trimming runs once.
+        """
+        trimmed = email_data.get('trimmed_content')
+        if trimmed is not None:
+            return trimmed
+        
+        clean_body = email_data.get('clean_body')
+        word_count = email_data.get('word_count_original')
+        email_id = email_data.get('id')
+        
+        if (clean_body is None or word_count is None) and email_id is not None:
+            row = self.db.read_connection().execute(
+                "SELECT clean_body, word_count_original FROM emails WHERE id = ?", (email_id,)
+            ).fetchone()
+            if row:
+                clean_body, word_count = row['clean_body'], row['word_count_original']
+        
+        trimmed = None
+        if clean_body is None or word_count is None:
+            body = email_data.get('body', '')
+            snippet = email_data.get('snippet', '')
+            
+            # Clean HTML content
+            clean_text = self._clean_html_content(body) if body else ""
+            
+            # Use cleaned body if available, otherwise snippet
+            if not clean_text:
+                clean_text = self._clean_html_content(snippet) if snippet else ""
+            
+            clean_body = clean_text
+            trimmed = self._trim_content(clean_body)
+            word_count = len(trimmed.split())
+            
+            if email_id is not None:
+                email_data['clean_body_row'] = (clean_body, word_count, email_id)
+        
+        email_data['clean_body'] = clean_body
+        email_data['word_count_original'] = word_count
+        email_data['trimmed_content'] = trimmed if trimmed is not None else self._trim_content(clean_body)
+        return email_data['trimmed_content']
+    
+    @staticmethod
+    def _trim_content(content: str) -> str:
+        """Limit content to CONTENT_CHAR_LIMIT chars, keeping the most informative sentences
+        
+        Sentences are scored by mean TF-IDF of their words (so a long greeting
+        doesn't crowd out a signature with dates) and the best ones that fit
+        the budget are kept in their original order.
+        """
+        if not content:
+            return ""
+        
+        # Short emails fit as-is - skip the ranker entirely
+        if len(content) <= CONTENT_CHAR_LIMIT:
+            return content
         
-        # Clean HTML content using BeautifulSoup
-        clean_body = self._clean_html_content(body) if body else ""
-        clean_snippet = self._clean_html_content(snippet) if snippet else ""
+        sentences = _SENTENCE_RE.split(content)
+        if len(sentences) < 2:
+            return content[:CONTENT_CHAR_LIMIT]
         
-        # Use cleaned body if available, otherwise snippet
-        content = clean_body if clean_body else clean_snippet
+        tokenized = [_WORD_RE.findall(sentence.lower()) for sentence in sentences]
+        doc_freq = Counter()
+        for tokens in tokenized:
+            doc_freq.update(set(tokens))
         
-        # Limit content to avoid token limits (keep first 3000 chars)
-        return content[:3000] if content else ""
+        n = len(sentences)
+        scores = []
+        for tokens in tokenized:
+            if not tokens:
+                scores.append(0.0)
+                continue
+            term_freq = Counter(tokens)
+            tfidf = sum(count * math.log(n / doc_freq[word]) for word, count in term_freq.items())
+            scores.append(tfidf / len(tokens))
+        
+        # Greedily take the highest-scoring sentences that still fit the budget
+        selected, used = [], 0
+        for i in sorted(range(n), key=scores.__getitem__, reverse=True):
+            length = len(sentences[i]) + 1
+            if used + length <= CONTENT_CHAR_LIMIT:
+                selected.append(i)
+                used += length
+        
+        if not selected:
+            return content[:CONTENT_CHAR_LIMIT]
+        
+        return ' '.join(sentences[i] for i in sorted(selected))
+    
+    def _store_clean_body(self, email_data: Dict):
+        """Materialize a single email's pending cleaned text and word count on its emails row"""
+        row = email_data.pop('clean_body_row', None)
+        if row is None:
+            return
+        
+        try:
+            self.db.cursor.execute(UPDATE_CLEAN_BODY_SQL, row)
+            self.db.conn.commit()
+        except Exception as e:
+            logger.error(f"❌ Failed to store cleaned body for email {row[2]}: {e}")
     
     def _clean_html_content(self, html_content: str) -> str:
-        """Clean HTML content using BeautifulSoup"""
+        """Clean HTML content using selectolax (Lexbor), falling back to BeautifulSoup"""
         if not html_content:
             return ""
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            tree = LexborHTMLParser(html_content)
             
             # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+            tree.strip_tags(['script', 'style'])
             
-            # Get text and clean it up
-            text = soup.get_text()
+            text = tree.body.text(separator=' ') if tree.body else ''
             
-            # Break into lines and remove leading and trailing space on each
-            lines = (line.strip() for line in text.splitlines())
+            # Collapse whitespace runs in one regex pass
+            return _WS_RE.sub(' ', text).strip()
+        except Exception as e:
+            logger.warning(f"⚠️ selectolax failed to parse HTML, falling back to BeautifulSoup: {e}")
+        
+        try:
+            from bs4 import BeautifulSoup, FeatureNotFound
+            
+            try:
+                soup = BeautifulSoup(html_content, 'lxml')
+            except FeatureNotFound:
+                # lxml not installed - fall back to the pure-Python parser
+                soup = BeautifulSoup(html_content, 'html.parser')
             
-            # Break multi-headlines into a line each
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+            # Remove script and style elements
+            for script in soup(["script", "style"]):
+                script.decompose()
             
-            # Drop blank lines
-            text = ' '.join(chunk for chunk in chunks if chunk)
+            # Get text and collapse whitespace runs in one regex pass
+            text = _WS_RE.sub(' ', soup.get_text(separator=' ')).strip()
             
             return text
         except Exception as e:
             logger.error(f"❌ Failed to clean HTML content: {e}")
             return html_content
     
-    def _generate_summary(self, email_data: Dict, summary_type: str) -> Dict:
+    def _generate_summary(self, email_data: Dict, summary_type: str,
+                          on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
         """Generate summary using advanced prompt templates"""
         
         try:
-            # Get the appropriate prompt template
-            prompt_template = self.summary_templates.get(summary_type, self.summary_templates['detailed'])
+            # Tiny emails ("Thanks!", auto-replies) don't need the model at all
+            trivial = self._get_trivial_summary(email_data)
+            if trivial:
+                return trivial
             
-            # Prepare email content
+            # Near-duplicate emails (newsletters, receipts) reuse a cached summary
             email_content = self._prepare_email_content(email_data)
-            sender = email_data.get('sender', 'Unknown')
-            subject = email_data.get('subject', 'No Subject')
-            date = email_data.get('date', '')
-            
-            # Format the prompt
-            if summary_type == 'detailed':
-                # Use chat template for detailed summaries
-                formatted_prompt = prompt_template.format(
-                    email_content=email_content,
-                    sender=sender,
-                    subject=subject,
-                    date=date
-                )
-                
-                # Create messages
-                messages = self.chat_template.format_messages(user_input=formatted_prompt)
-                
-                # Get AI response
-                response = self.llm.invoke(messages)
-                
-                # Parse the response
-                summary_results = self.output_parser.parse(response.content)
-                
-            else:
-                # Use simple prompt template for other types
-                formatted_prompt = prompt_template.format(
-                    email_content=email_content,
-                    sender=sender,
-                    subject=subject,
-                    date=date
-                )
-                
-                # Create simple message
-                messages = [
-                    SystemMessage(content="You are an expert email summarization assistant."),
-                    HumanMessage(content=formatted_prompt)
-                ]
-                
-                response = self.llm.invoke(messages)
-                
-                # Parse the response
-                summary_results = self.output_parser.parse(response.content)
+            semantic_cache = self._get_semantic_cache(summary_type)
+            embedding = semantic_cache.embed(email_content) if email_content else None
+            cached = semantic_cache.lookup(embedding)
+            if cached:
+                return orjson.loads(cached)
+            
+            messages = self._build_summary_messages(email_data, summary_type, email_content)
             
-            # Validate and clean results
-            return self._validate_summary_results(summary_results, summary_type)
+            # Stream the AI response so callers can show progress before it completes
+            chunks = []
+            for chunk in self.llm.stream(messages):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    if on_chunk:
+                        on_chunk(chunk.content)
+            
+            # Parse and validate the response in one pass
+            summary_results = self.output_parser.parse(''.join(chunks))
+            semantic_cache.add(embedding, orjson.dumps(summary_results).decode())
+            return summary_results
             
         except Exception as e:
             logger.error(f"❌ Summary generation failed: {e}")
             return self._get_fallback_summary(email_data)
     
-    def _validate_summary_results(self, results: Dict, summary_type: str) -> Dict:
-        """Validate and clean summary results"""
-        validated = {
-            'brief_summary': str(results.get('brief_summary', 'Summary not available'))[:500],
-            'detailed_summary': str(results.get('detailed_summary', 'Detailed summary not available'))[:1500],
-            'key_points': results.get('key_points', [])[:10],  # Limit to 10 points
-            'action_items': results.get('action_items', [])[:10],  # Limit to 10 actions
-            'important_dates': results.get('important_dates', [])[:10],  # Limit to 10 dates
-            'mentioned_people': results.get('mentioned_people', [])[:20],  # Limit to 20 people
-        }
+    async def _agenerate_summary(self, email_data: Dict, summary_type: str) -> Dict:
+        """Async variant of _generate_summary"""
         
-        # Ensure all list items are strings
-        for key in ['key_points', 'action_items', 'important_dates', 'mentioned_people']:
-            validated[key] = [str(item)[:200] for item in validated[key] if item]
+        try:
+            trivial = self._get_trivial_summary(email_data)
+            if trivial:
+                return trivial
+            
+            email_content = self._prepare_email_content(email_data)
+            semantic_cache = self._get_semantic_cache(summary_type)
+            embedding = await semantic_cache.aembed(email_content) if email_content else None
+            cached = semantic_cache.lookup(embedding)
+            if cached:
+                return orjson.loads(cached)
+            
+            messages = self._build_summary_messages(email_data, summary_type, email_content)
+            response = await self.llm.ainvoke(messages)
+            summary_results = self.output_parser.parse(response.content)
+            semantic_cache.add(embedding, orjson.dumps(summary_results).decode())
+            return summary_results
+            
+        except Exception as e:
+            logger.error(f"❌ Summary generation failed: {e}")
+            return self._get_fallback_summary(email_data)
+    
+    def _get_semantic_cache(self, summary_type: str) -> "SemanticCache":
+        """Return the semantic cache for a summary type (one table per type)"""
+        from utils.caching import SemanticCache
+        
+        if summary_type not in self.summary_templates:
+            summary_type = 'detailed'
         
-        return validated
+        if summary_type not in self._semantic_caches:
+            self._semantic_caches[summary_type] = SemanticCache(
+                self.db, table=f"cached_summaries_{summary_type}", threshold=SUMMARY_CACHE_THRESHOLD
+            )
+        return self._semantic_caches[summary_type]
+    
+    def _build_summary_messages(self, email_data: Dict, summary_type: str,
+                                email_content: Optional[str] = None) -> List:
+        """Format the prompt messages for a summary request"""
+        # Get the appropriate prompt template
+        raw_template = self._raw_templates.get(summary_type, self._raw_templates['detailed'])
+        
+        # Prepare email content
+        if email_content is None:
+            email_content = self._prepare_email_content(email_data)
+        sender = email_data.get('sender', 'Unknown')
+        subject = email_data.get('subject', 'No Subject')
+        date = email_data.get('date', '')
+        
+        # Format the prompt
+        formatted_prompt = raw_template.format(
+            email_content=email_content,
+            sender=sender,
+            subject=subject,
+            date=date
+        )
+        
+        # Detailed summaries get the full system prompt, other types the short one
+        system_prompt = SUMMARY_SYSTEM_PROMPT if summary_type == 'detailed' else SIMPLE_SYSTEM_PROMPT
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=formatted_prompt)
+        ]
+    
+    def _get_trivial_summary(self, email_data: Dict) -> Optional[Dict]:
+        """Summarize very short emails from their own text, or None if the email needs the model"""
+        email_content = self._prepare_email_content(email_data)
+        
+        # Don't let a newsletter's unsubscribe footer count toward the length -
+        # only look in the second half so a header link can't hide the body
+        footer = _UNSUBSCRIBE_RE.search(email_content, len(email_content) // 2)
+        text = email_content[:footer.start()].strip() if footer else email_content
+        
+        if len(text.split()) >= MIN_SUMMARY_WORDS:
+            return None
+        
+        text = text or email_content or email_data.get('subject', '')
+        logger.info(f"⚡ Email {email_data.get('id')} is too short to need the model, summarizing directly")
+        return self.output_parser.from_dict({
+            'brief_summary': text,
+            'detailed_summary': text,
+            'key_points': [],
+            'action_items': [],
+            'important_dates': [],
+            'mentioned_people': []
+        })
     
     def _get_fallback_summary(self, email_data: Dict) -> Dict:
         """Provide fallback summary when AI fails"""
@@ -498,54 +971,103 @@ class AIEmailSummarizer:
             'mentioned_people': []
         }
     
-    def _store_summary(self, summary: EmailSummary):
-        """Store summary results in database"""
+    @staticmethod
+    def _summary_row(summary: EmailSummary) -> List:
+        """Bind parameters for INSERT_SUMMARY_SQL"""
+        row = list(_GET_SUMMARY_ROW(summary))
+        for i in _JSON_ROW_INDEXES:
+            row[i] = orjson.dumps(row[i]).decode()
+        return row
+    
+    def _writer_loop(self):
+        """Drain queued summaries in small batches on a dedicated connection"""
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        
+        while True:
+            batch = [self._write_queue.get()]
+            try:
+                while len(batch) < WRITE_BATCH_SIZE:
+                    batch.append(self._write_queue.get(timeout=WRITE_DRAIN_TIMEOUT_SECONDS))
+            except queue.Empty:
+                pass
+            
+            try:
+                self._store_summaries(batch, conn)
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    def flush(self):
+        """Block until every queued summary has been written"""
+        self._write_queue.join()
+    
+    def _store_summaries(self, summaries: List[EmailSummary], conn: Optional[sqlite3.Connection] = None,
+                         clean_body_rows: Optional[List[tuple]] = None,
+                         summarized_ids: Optional[List[int]] = None):
+        """Store summaries and mark their emails summarized in a single transaction
+        
+        clean_body_rows, (clean_body, word_count_original, email_id) tuples from
+        _prepare_email_content, are written in the same transaction.
+        summarized_ids are further emails to flag whose summaries are already stored.
+        """
+        if not summaries and not clean_body_rows and not summarized_ids:
+            return
+        
+        conn = conn or self.db.conn
         try:
-            self.db.cursor.execute("""
-                INSERT OR REPLACE INTO email_summaries 
-                (email_id, gmail_id, brief_summary, detailed_summary, key_points, 
-                 action_items, important_dates, mentioned_people, summary_type,
-                 word_count_original, word_count_summary, compression_ratio,
-                 summary_timestamp, processing_time_ms)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                summary.email_id,
-                summary.gmail_id,
-                summary.brief_summary,
-                summary.detailed_summary,
-                json.dumps(summary.key_points),
-                json.dumps(summary.action_items),
-                json.dumps(summary.important_dates),
-                json.dumps(summary.mentioned_people),
-                summary.summary_type,
-                summary.word_count_original,
-                summary.word_count_summary,
-                summary.compression_ratio,
-                summary.summary_timestamp,
-                summary.processing_time_ms
-            ))
-            self.db.conn.commit()
+            # Flush any implicit transaction so BEGIN IMMEDIATE starts cleanly
+            if conn.in_transaction:
+                conn.commit()
+            
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(INSERT_SUMMARY_SQL, [self._summary_row(s) for s in summaries])
+            if clean_body_rows:
+                conn.executemany(UPDATE_CLEAN_BODY_SQL, clean_body_rows)
+            
+            # One UPDATE for the whole batch instead of one per email
+            email_ids = list({s.email_id for s in summaries}.union(summarized_ids or ()))
+            if email_ids:
+                placeholders = ','.join('?' * len(email_ids))
+                conn.execute(
+                    f"UPDATE emails SET ai_summarized = TRUE WHERE id IN ({placeholders})",
+                    email_ids
+                )
+            conn.commit()
+            logger.info(f"💾 Stored {len(summaries)} summaries in one transaction")
             
         except Exception as e:
-            logger.error(f"❌ Failed to store summary: {e}")
+            conn.rollback()
+            logger.error(f"❌ Failed to bulk store summaries: {e}")
     
     def _is_already_summarized(self, email_id: int, summary_type: str) -> bool:
         """Check if email is already summarized with specified type"""
-        self.db.cursor.execute(
-            "SELECT 1 FROM email_summaries WHERE email_id = ? AND summary_type = ?", 
+        # Read-only per-thread connection so concurrent checks don't contend with writes
+        row = self.db.read_connection().execute(
+            "SELECT EXISTS(SELECT 1 FROM email_summaries WHERE email_id = ? AND summary_type = ?)", 
             (email_id, summary_type)
-        )
-        return self.db.cursor.fetchone() is not None
+        ).fetchone()
+        return bool(row[0])
+    
+    def _get_summarized_email_ids(self, summary_type: str) -> set:
+        """Return the ids of all emails that already have a summary of this type"""
+        try:
+            rows = self.db.read_connection().execute(
+                "SELECT email_id FROM email_summaries WHERE summary_type = ?", (summary_type,)
+            ).fetchall()
+            return {row[0] for row in rows}
+        except Exception as e:
+            logger.error(f"❌ Failed to load summarized email ids: {e}")
+            return set()
     
     def _get_existing_summary(self, email_id: int, summary_type: str) -> Optional[EmailSummary]:
         """Get existing summary from database"""
         try:
-            self.db.cursor.execute("""
-                SELECT * FROM email_summaries 
+            row = self.db.read_connection().execute(f"""
+                SELECT {SUMMARY_COLUMNS_SQL} FROM email_summaries 
                 WHERE email_id = ? AND summary_type = ?
-            """, (email_id, summary_type))
-            
-            row = self.db.cursor.fetchone()
+            """, (email_id, summary_type)).fetchone()
+
             if not row:
                 return None
             
@@ -554,10 +1076,10 @@ class AIEmailSummarizer:
                 gmail_id=row['gmail_id'],
                 brief_summary=row['brief_summary'],
                 detailed_summary=row['detailed_summary'],
-                key_points=json.loads(row['key_points'] or '[]'),
-                action_items=json.loads(row['action_items'] or '[]'),
-                important_dates=json.loads(row['important_dates'] or '[]'),
-                mentioned_people=json.loads(row['mentioned_people'] or '[]'),
+                key_points=orjson.loads(row['key_points'] or '[]'),
+                action_items=orjson.loads(row['action_items'] or '[]'),
+                important_dates=orjson.loads(row['important_dates'] or '[]'),
+                mentioned_people=orjson.loads(row['mentioned_people'] or '[]'),
                 summary_type=row['summary_type'],
                 word_count_original=row['word_count_original'],
                 word_count_summary=row['word_count_summary'],
@@ -570,20 +1092,19 @@ class AIEmailSummarizer:
             logger.error(f"❌ Failed to get existing summary: {e}")
             return None
     
-    def _mark_email_summarized(self, email_id: int):
-        """Mark email as summarized in emails table"""
-        try:
-            self.db.cursor.execute(
-                "UPDATE emails SET ai_summarized = TRUE WHERE id = ?", (email_id,)
-            )
-            self.db.conn.commit()
-        except Exception as e:
-            logger.error(f"❌ Failed to mark email as summarized: {e}")
-    
-    def batch_summarize_emails(self, limit: int = 10, summary_type: str = "detailed") -> List[EmailSummary]:
-        """Summarize multiple emails in batch"""
+    def batch_summarize_emails(self, limit: int = 10, summary_type: str = "detailed",
+                               use_batch_api: bool = False) -> List[EmailSummary]:
+        """Summarize multiple emails in batch
+        
+        With use_batch_api the emails go to Gemini's Batch API as one offline
+        job - cheaper per token but it can take minutes to hours, so it is
+        meant for background runs rather than the interactive dashboard.
+        """
         logger.info(f"🚀 Starting batch summarization of up to {limit} emails ({summary_type})")
         
+        # Make sure interactive summaries still in the write queue are visible below
+        self.flush()
+        
         # Get unsummarized emails
         unsummarized_emails = self._get_unsummarized_emails(limit)
         
@@ -591,20 +1112,139 @@ class AIEmailSummarizer:
             logger.info("📭 No unsummarized emails found")
             return []
         
-        results = []
-        for i, email in enumerate(unsummarized_emails, 1):
-            logger.info(f"📝 Processing {i}/{len(unsummarized_emails)}")
-            
-            summary = self.summarize_email(dict(email), summary_type)
-            if summary:
-                results.append(summary)
+        # One query for every already-summarized email instead of a check per email
+        already_summarized = self._get_summarized_email_ids(summary_type)
+        
+        emails, results, existing_ids = [], [], []
+        for email in unsummarized_emails:
+            if email['id'] in already_summarized:
+                logger.info(f"⏭️ Email {email['id']} already summarized ({summary_type}), retrieving existing")
+                existing_ids.append(email['id'])
+                existing = self._get_existing_summary(email['id'], summary_type)
+                if existing:
+                    results.append(existing)
+            else:
+                emails.append(dict(email))
+        
+        new_summaries = []
+        if emails:
+            new_summaries = self._summarize_emails_via_batch_api(emails, summary_type) if use_batch_api else None
             
-            # Small delay to avoid rate limits
-            time.sleep(0.5)
+            if new_summaries is None:
+                from utils.llm_client import run_async
+                
+                # Fan the LLM calls out concurrently; the client's own retry/backoff
+                # (max_retries) handles rate limiting instead of a fixed sleep
+                new_summaries = run_async(self._summarize_emails_concurrently(emails, summary_type))
+            results.extend(new_summaries)
+        
+        # Persist after the fan-out in one transaction: only the new summaries are
+        # inserted (re-inserting existing rows would change their ids), while the
+        # existing ones just get their emails flagged alongside
+        clean_body_rows = [email['clean_body_row'] for email in emails if 'clean_body_row' in email]
+        self._store_summaries(new_summaries, clean_body_rows=clean_body_rows, summarized_ids=existing_ids)
         
         logger.info(f"✅ Batch summarization complete: {len(results)} emails summarized")
         return results
     
+    async def _summarize_emails_concurrently(self, emails: List[Dict], summary_type: str) -> List[EmailSummary]:
+        """Summarize emails concurrently with at most SUMMARY_CONCURRENCY calls in flight"""
+        semaphore = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+        total = len(emails)
+        
+        async def summarize(i: int, email: Dict) -> Optional[EmailSummary]:
+            async with semaphore:
+                logger.info(f"📝 Processing {i}/{total}")
+                return await self._summarize_email_async(email, summary_type)
+        
+        summaries = await asyncio.gather(*(summarize(i, email) for i, email in enumerate(emails, 1)))
+        return [summary for summary in summaries if summary]
+    
+    def _summarize_emails_via_batch_api(self, emails: List[Dict], summary_type: str) -> Optional[List[EmailSummary]]:
+        """Summarize emails with one Gemini Batch API job, or None if the job can't be used"""
+        start_time = time.time()
+        
+        # Tiny emails are summarized locally; only the rest go into the job
+        results, pending = [], []
+        for email in emails:
+            trivial = self._get_trivial_summary(email)
+            if trivial:
+                results.append(self._build_summary(email, summary_type, trivial, start_time))
+            else:
+                pending.append(email)
+        
+        if not pending:
+            return results
+        
+        # Render every prompt up front; the job carries them all in one request
+        requests = []
+        for email in pending:
+            system_message, human_message = self._build_summary_messages(email, summary_type)
+            requests.append({
+                'contents': [{'role': 'user', 'parts': [{'text': human_message.content}]}],
+                'config': {'system_instruction': system_message.content, 'temperature': 0.1},
+            })
+        
+        responses = self._submit_batch_job(requests)
+        if responses is None:
+            return None
+        
+        for email, text in zip(pending, responses):
+            if text is None:
+                summary_results = self._get_fallback_summary(email)
+            else:
+                summary_results = self.output_parser.parse(text)
+            results.append(self._build_summary(email, summary_type, summary_results, start_time))
+        
+        return results
+    
+    def _submit_batch_job(self, requests: List[Dict]) -> Optional[List[Optional[str]]]:
+        """Run inline requests as a Gemini batch job and return each response text in order"""
+        try:
+            from google import genai
+        except ImportError:
+            logger.warning("⚠️ google-genai not installed, falling back to concurrent summarization")
+            return None
+        
+        try:
+            # Keep one client (and its pooled HTTP connections) for every job and poll
+            if self._genai_client is None:
+                self._genai_client = genai.Client()
+            client = self._genai_client
+            job = client.batches.create(
+                model=BATCH_API_MODEL,
+                src=requests,
+                config={'display_name': f"email-summaries-{int(time.time())}"},
+            )
+            logger.info(f"📤 Submitted Gemini batch job {job.name} with {len(requests)} requests")
+            
+            deadline = time.time() + BATCH_JOB_TIMEOUT_SECONDS
+            while job.state.name not in BATCH_DONE_STATES:
+                if time.time() > deadline:
+                    logger.error(f"❌ Gemini batch job {job.name} timed out")
+                    return None
+                time.sleep(BATCH_POLL_INTERVAL_SECONDS)
+                job = client.batches.get(name=job.name)
+            
+            if job.state.name != 'JOB_STATE_SUCCEEDED':
+                logger.error(f"❌ Gemini batch job {job.name} ended in {job.state.name}")
+                return None
+            
+            texts = []
+            for inline in job.dest.inlined_responses:
+                if inline.response is not None:
+                    texts.append(inline.response.text)
+                else:
+                    logger.warning(f"⚠️ Batch request failed: {inline.error}")
+                    texts.append(None)
+            
+            logger.info(f"✅ Gemini batch job {job.name} finished")
+            return texts
+            
+        except Exception as e:
+            logger.error(f"❌ Gemini batch job failed: {e}")
+            return None
+    
     def _get_unsummarized_emails(self, limit: int) -> List:
         """Get emails that haven't been summarized yet"""
         self.db.cursor.execute("""
@@ -619,8 +1259,11 @@ class AIEmailSummarizer:
     def get_email_summaries(self, email_id: int) -> List[Dict]:
         """Get all summaries for a specific email"""
         try:
-            self.db.cursor.execute("""
-                SELECT * FROM email_summaries 
+            # Include summaries still waiting in the background write queue
+            self.flush()
+            
+            self.db.cursor.execute(f"""
+                SELECT {SUMMARY_COLUMNS_SQL} FROM email_summaries 
                 WHERE email_id = ? 
                 ORDER BY summary_timestamp DESC
             """, (email_id,))
@@ -629,10 +1272,10 @@ class AIEmailSummarizer:
             for row in self.db.cursor.fetchall():
                 summary_dict = dict(row)
                 # Parse JSON fields
-                summary_dict['key_points'] = json.loads(summary_dict.get('key_points', '[]'))
-                summary_dict['action_items'] = json.loads(summary_dict.get('action_items', '[]'))
-                summary_dict['important_dates'] = json.loads(summary_dict.get('important_dates', '[]'))
-                summary_dict['mentioned_people'] = json.loads(summary_dict.get('mentioned_people', '[]'))
+                summary_dict['key_points'] = orjson.loads(summary_dict.get('key_points', '[]'))
+                summary_dict['action_items'] = orjson.loads(summary_dict.get('action_items', '[]'))
+                summary_dict['important_dates'] = orjson.loads(summary_dict.get('important_dates', '[]'))
+                summary_dict['mentioned_people'] = orjson.loads(summary_dict.get('mentioned_people', '[]'))
                 results.append(summary_dict)
             
             return results
@@ -642,68 +1285,28 @@ class AIEmailSummarizer:
             return []
     
     def get_summary_stats(self) -> Dict:
-        """Get summarization statistics"""
+        """Get summarization statistics with a single aggregate query"""
         try:
-            # Total emails summarized
-            self.db.cursor.execute("SELECT COUNT(DISTINCT email_id) as total FROM email_summaries")
-            total_summarized = self.db.cursor.fetchone()['total']
-            
-            # Summary type distribution
-            self.db.cursor.execute("""
-                SELECT summary_type, COUNT(*) as count 
-                FROM email_summaries 
-                GROUP BY summary_type
-            """)
-            type_dist = {row['summary_type']: row['count'] 
-                        for row in self.db.cursor.fetchall()}
+            row = self.db.read_connection().execute(SUMMARY_STATS_SQL).fetchone()
+            stats = orjson.loads(row['stats'])
             
-            # Average compression ratio
-            self.db.cursor.execute("SELECT AVG(compression_ratio) as avg_compression FROM email_summaries")
-            avg_compression = self.db.cursor.fetchone()['avg_compression'] or 0
-            
-            # Average processing time
-            self.db.cursor.execute("SELECT AVG(processing_time_ms) as avg_time FROM email_summaries")
-            avg_processing_time = self.db.cursor.fetchone()['avg_time'] or 0
-            
-            # Total action items identified
-            self.db.cursor.execute("""
-                SELECT COUNT(*) as total_actions FROM (
-                    SELECT action_items FROM email_summaries 
-                    WHERE action_items != '[]'
-                )
-            """)
-            emails_with_actions = self.db.cursor.fetchone()['total_actions']
+            total_summarized = stats['total']
+            total_emails = stats['emails']
+            completion_rate = round((total_summarized / total_emails) * 100, 2) if total_emails else 0.0
             
             return {
                 'total_emails_summarized': total_summarized,
-                'summary_type_distribution': type_dist,
-                'average_compression_ratio': round(avg_compression, 2),
-                'average_processing_time_ms': round(avg_processing_time, 2),
-                'emails_with_action_items': emails_with_actions,
-                'summarization_completion_rate': self._get_summarization_completion_rate()
+                'summary_type_distribution': stats['types'],
+                'average_compression_ratio': round(stats['avg_compression'] or 0, 2),
+                'average_processing_time_ms': round(stats['avg_time'] or 0, 2),
+                'emails_with_action_items': stats['with_actions'],
+                'summarization_completion_rate': completion_rate
             }
             
         except Exception as e:
             logger.error(f"❌ Failed to get summary stats: {e}")
             return {}
     
-    def _get_summarization_completion_rate(self) -> float:
-        """Calculate percentage of emails that have been summarized"""
-        try:
-            self.db.cursor.execute("SELECT COUNT(*) as total FROM emails")
-            total_emails = self.db.cursor.fetchone()['total']
-            
-            if total_emails == 0:
-                return 0.0
-            
-            self.db.cursor.execute("SELECT COUNT(DISTINCT email_id) as summarized FROM email_summaries")
-            summarized_emails = self.db.cursor.fetchone()['summarized']
-            
-            return round((summarized_emails / total_emails) * 100, 2)
-            
-        except Exception:
-            return 0.0
-    
     def delete_summary(self, email_id: int, summary_type: str = None) -> bool:
         """Delete summaries for an email"""
         try:
@@ -725,5 +1328,8 @@ class AIEmailSummarizer:
             logger.error(f"❌ Failed to delete summary: {e}")
             return False
 
-# Singleton instance
-email_summarizer = AIEmailSummarizer()
\ No newline at end of file
+# Singleton instance, created on first use so importing this module stays cheap
+@lru_cache(maxsize=1)
+def get_email_summarizer() -> AIEmailSummarizer:
+    """Return the shared AIEmailSummarizer, initializing it lazily"""
+    return AIEmailSummarizer()
\ No newline at end of file
@@ -0,0 +1,98 @@
+# src/attachment_processing/_cache.py
+
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+
+from src.utils.config_loader import config
+
+# Extracted text is stored as <CACHE_DIR>/attachments/<hash>.<kind>.txt
+CACHE_DIR = Path(config.CACHE_DIR) / "attachments"
+# Recently extracted texts kept in memory per process, in front of the disk cache
+MEMORY_CACHE_SIZE = 64
+
+_memory_cache: "OrderedDict[str, str]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _cache_key(data) -> str:
+    """Content hash of an attachment payload (raw bytes or a binary file over them)"""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    # File-like (BytesIO, SpooledTemporaryFile): hash in chunks, then rewind
+    h = hashlib.blake2b(digest_size=16)
+    data.seek(0)
+    for chunk in iter(lambda: data.read(1 << 20), b''):
+        h.update(chunk)
+    data.seek(0)
+    return h.hexdigest()
+
+
+def _memory_get(name: str):
+    """Return a text from the in-memory tier, marking it most recently used"""
+    with _memory_lock:
+        text = _memory_cache.get(name)
+        if text is not None:
+            _memory_cache.move_to_end(name)
+        return text
+
+
+def _memory_put(name: str, text: str):
+    """Add a text to the in-memory tier, evicting the least recently used"""
+    with _memory_lock:
+        _memory_cache[name] = text
+        _memory_cache.move_to_end(name)
+        if len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def cached_extractor(kind: str):
+    """
+    Cache a read_* extractor's text on disk, keyed by a hash of its input.
+
+    Reprocessing the same attachment becomes a file read - or a dict lookup
+    when this process extracted it recently (e.g. a retry). Error results are
+    never cached, and ATTACHMENT_CACHE=off disables the cache entirely.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(data):
+            if not config.ENABLE_ATTACHMENT_CACHE:
+                return func(data)
+
+            name = f"{_cache_key(data)}.{kind}.txt"
+            text = _memory_get(name)
+            if text is not None:
+                return text
+
+            path = CACHE_DIR / name
+            try:
+                text = path.read_text(encoding='utf-8')
+                _memory_put(name, text)
+                return text
+            except OSError:
+                pass
+
+            text = func(data)
+            if text.startswith('[Error'):
+                return text
+            _memory_put(name, text)
+
+            try:
+                # Write to a temp file and rename so readers never see partial text
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_path, path)
+            except OSError:
+                # A cache write failure shouldn't fail the extraction
+                pass
+            return text
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+# src/attachment_processing/_io.py
+
+import binascii
+import tempfile
+from io import BytesIO
+from typing import BinaryIO, Union
+
+# What every read_* function accepts: the decoded attachment bytes, or a
+# seekable binary file over them (BytesIO, SpooledTemporaryFile, ...)
+AttachmentData = Union[bytes, BinaryIO]
+
+# URL-safe -> standard alphabet, applied at the byte level before decoding
+_B64_TR = bytes.maketrans(b'-_', b'+/')
+
+# Spooled decodes stay in memory up to this size, then spill to a temp file
+SPOOL_MAX_IN_MEMORY = 8 << 20
+# Base64 characters decoded per step - a multiple of 4 so chunks never split a quantum
+B64_DECODE_CHUNK = 64 << 10
+
+
+def as_bytes(data: AttachmentData) -> bytes:
+    """Return the raw attachment bytes without copying when already bytes"""
+    if isinstance(data, BytesIO):
+        return data.getvalue()
+    if hasattr(data, 'read'):
+        data.seek(0)
+        return data.read()
+    return data
+
+
+def as_stream(data: AttachmentData) -> BinaryIO:
+    """Return a seekable stream over the attachment, wrapping bytes if needed"""
+    if hasattr(data, 'read'):
+        data.seek(0)
+        return data
+    return BytesIO(data)
+
+
+def decode_b64(data_base64) -> bytes:
+    """Decode a Gmail (URL-safe) base64 attachment payload"""
+    if isinstance(data_base64, str):
+        data_base64 = data_base64.encode('ascii')
+    # Gmail omits '=' padding, which a2b_base64 rejects; restore it when needed
+    pad = -len(data_base64) % 4
+    if pad:
+        data_base64 += b'=' * pad
+    # One bytes.translate + the C decoder; urlsafe_b64decode adds a Python-level
+    # translate and extra copies. a2b_base64 is non-strict by default (3.8+).
+    return binascii.a2b_base64(data_base64.translate(_B64_TR))
+
+
+def b64_to_spooled(data_base64, max_in_memory: int = SPOOL_MAX_IN_MEMORY) -> BinaryIO:
+    """
+    Decode a base64 payload chunk by chunk into a SpooledTemporaryFile.
+
+    Only one chunk of decoded bytes exists at a time, and past max_in_memory
+    the output spills to disk - so a 100 MB attachment doesn't sit in memory
+    as base64 text, decoded bytes and a BytesIO copy all at once.
+    """
+    if isinstance(data_base64, str):
+        data_base64 = data_base64.encode('ascii')
+    # Gmail omits '=' padding; restore it so the final chunk decodes
+    data_base64 = data_base64.rstrip(b'=')
+    data_base64 += b'=' * (-len(data_base64) % 4)
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_in_memory)
+    view = memoryview(data_base64)
+    for start in range(0, len(view), B64_DECODE_CHUNK):
+        chunk = view[start:start + B64_DECODE_CHUNK].tobytes()
+        spooled.write(binascii.a2b_base64(chunk.translate(_B64_TR)))
+    spooled.seek(0)
+    return spooled
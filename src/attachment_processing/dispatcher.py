@@ -0,0 +1,93 @@
+# src/attachment_processing/dispatcher.py
+
+import os
+import importlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Reader for each supported MIME type, as (module, function) so the parent
+# process never has to import the heavy parsing libraries itself
+READERS_BY_MIME = {
+    'application/pdf': ('pdf_reader', 'read_pdf'),
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': ('docx_reader', 'read_docx'),
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ('excel_reader', 'read_excel'),
+    'application/vnd.ms-excel': ('excel_reader', 'read_excel'),
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation': ('pptx_reader', 'read_pptx'),
+}
+IMAGE_READER = ('image_reader', 'read_image')
+
+DEFAULT_NUM_WORKERS = min(os.cpu_count() or 1, 4)
+
+# Reader functions loaded once per worker process by _init_worker
+_readers: Dict[Tuple[str, str], Callable] = {}
+
+
+def _reader_for(mime_type: str) -> Optional[Tuple[str, str]]:
+    """Pick the reader for a MIME type, or None if it isn't supported"""
+    mime_type = (mime_type or '').lower()
+    if mime_type.startswith('image/'):
+        return IMAGE_READER
+    return READERS_BY_MIME.get(mime_type)
+
+
+def _init_worker():
+    """
+    Resolve every reader function once per worker. The reader modules are
+    light - each parsing library (PyMuPDF, python-calamine, ...) is imported the first
+    time a worker actually gets an attachment of that type.
+    """
+    for module_name, func_name in {*READERS_BY_MIME.values(), IMAGE_READER}:
+        module = importlib.import_module(f"{__package__}.{module_name}")
+        _readers[(module_name, func_name)] = getattr(module, func_name)
+
+
+def _run_reader(reader: Tuple[str, str], data) -> str:
+    """Worker entry point: run one reader on one attachment"""
+    return _readers[reader](data)
+
+
+def process_attachments(attachments: Iterable[Tuple[Any, str, Any]],
+                        num_workers: int = DEFAULT_NUM_WORKERS,
+                        progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[Any, str]:
+    """
+    Extract text from many attachments in parallel worker processes.
+
+    attachments is an iterable of (attachment_id, mime_type, data) tuples, where
+    data is the decoded attachment bytes (decode Gmail's base64 once, before
+    calling this - the readers no longer decode it themselves). Returns a dict of
+    attachment_id -> extracted text; unsupported MIME types are skipped.
+    progress_callback, if given, is called as (completed, total) after each one.
+    """
+    jobs = []
+    for attachment_id, mime_type, data in attachments:
+        reader = _reader_for(mime_type)
+        if reader is None:
+            logger.debug(f"Skipping unsupported attachment type {mime_type}")
+            continue
+        jobs.append((attachment_id, reader, data))
+
+    results = {}
+    if not jobs:
+        return results
+
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(_run_reader, reader, data): attachment_id
+                   for attachment_id, reader, data in jobs}
+
+        for completed, future in enumerate(as_completed(futures), 1):
+            attachment_id = futures[future]
+            try:
+                results[attachment_id] = future.result()
+            except Exception as e:
+                logger.error(f"❌ Attachment {attachment_id} failed to process: {e}")
+                results[attachment_id] = f"[Error reading attachment] {e}"
+
+            if progress_callback:
+                progress_callback(completed, len(futures))
+
+    logger.info(f"✅ Processed {len(results)} attachments with {num_workers} workers")
+    return results
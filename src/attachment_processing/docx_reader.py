@@ -1,13 +1,30 @@
-import docx
-import base64
-from io import BytesIO
+from ._cache import cached_extractor
+from ._io import AttachmentData, as_stream, b64_to_spooled
 
-def read_docx(data_base64):
+# WordprocessingML paragraph and text-run tags (what docx.oxml.ns.qn returns)
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_P = W_NS + 'p'
+W_T = W_NS + 't'
+
+@cached_extractor("docx")
+def read_docx(data: AttachmentData):
     try:
-        doc_bytes = base64.urlsafe_b64decode(data_base64)
-        doc_file = BytesIO(doc_bytes)
-        doc = docx.Document(doc_file)
-        text = '\n'.join([p.text for p in doc.paragraphs])
+        import docx  # Imported on first use
+        doc = docx.Document(as_stream(data))
+        # Walk the body XML directly - skips python-docx's Paragraph/Run objects
+        # and the intermediate list of paragraph strings
+        text = '\n'.join(''.join(t.text or '' for t in p.iter(W_T))
+                         for p in doc.element.body.iter(W_P))
         return text.strip()
     except Exception as e:
         return f"[Error reading DOCX] {e}"
+
+def read_docx_from_b64(data_base64):
+    """Backward-compatible entry point for base64-encoded payloads"""
+    # Stream-decode into a spooled file - the parser reads it like any other file
+    try:
+        spooled = b64_to_spooled(data_base64)
+    except Exception as e:
+        return f"[Error reading DOCX] {e}"
+    with spooled as f:
+        return read_docx(f)
@@ -1,15 +1,43 @@
-import pandas as pd
-import base64
-from io import BytesIO
+from ._cache import cached_extractor
+from ._io import AttachmentData, as_stream, b64_to_spooled
 
-def read_excel(data_base64):
+def _iter_sheets(excel_file):
+    """Yield (sheet name, rows of cell values) with python-calamine, falling back to openpyxl"""
     try:
-        excel_bytes = base64.urlsafe_b64decode(data_base64)
-        excel_file = BytesIO(excel_bytes)
-        df = pd.read_excel(excel_file, sheet_name=None)  # Read all sheets
-        text = ''
-        for sheet_name, sheet in df.items():
-            text += f"Sheet: {sheet_name}\n{sheet.to_string(index=False)}\n\n"
-        return text.strip()
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        # python-calamine not installed - openpyxl's read-only mode also skips styles
+        from openpyxl import load_workbook
+        wb = load_workbook(excel_file, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                yield ws.title, ws.iter_rows(values_only=True)
+        finally:
+            wb.close()
+        return
+
+    wb = CalamineWorkbook.from_filelike(excel_file)
+    for sheet_name in wb.sheet_names:
+        yield sheet_name, wb.get_sheet_by_name(sheet_name).to_python()
+
+@cached_extractor("xlsx")
+def read_excel(data: AttachmentData):
+    try:
+        parts = []
+        for sheet_name, rows in _iter_sheets(as_stream(data)):  # Read all sheets
+            # Raw cell values as tab-separated rows - no DataFrame, dtype inference or to_string
+            lines = ('\t'.join('' if cell is None else str(cell) for cell in row) for row in rows)
+            parts.append(f"Sheet: {sheet_name}\n" + '\n'.join(lines))
+        return '\n\n'.join(parts).strip()
+    except Exception as e:
+        return f"[Error reading Excel] {e}"
+
+def read_excel_from_b64(data_base64):
+    """Backward-compatible entry point for base64-encoded payloads"""
+    # Stream-decode into a spooled file - the parser reads it like any other file
+    try:
+        spooled = b64_to_spooled(data_base64)
     except Exception as e:
         return f"[Error reading Excel] {e}"
+    with spooled as f:
+        return read_excel(f)
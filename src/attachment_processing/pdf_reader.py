@@ -1,14 +1,68 @@
-import PyPDF2
-import base64
-from io import BytesIO
+import os
+import tempfile
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from ._cache import cached_extractor
+from ._io import AttachmentData, as_bytes, decode_b64
 
-def read_pdf(data_base64):
+# Worker processes used to extract pages of large PDFs
+PAGE_WORKERS = 4
+# Above this many pages, extract in worker processes (PyMuPDF isn't thread-safe)
+PROCESS_PAGE_THRESHOLD = 50
+# Above this size, spill the PDF to a temp file and let PyMuPDF open it by path
+SPILL_TO_DISK_BYTES = 16 << 20
+
+
+def _open_pdf(source):
+    """Open a PDF from a file path or from in-memory bytes"""
+    import fitz  # PyMuPDF, imported on first use
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def _extract_pages(source, page_indexes):
+    """Extract the plain text of a run of pages with a private document handle"""
+    with _open_pdf(source) as doc:
+        return [doc[i].get_text("text") for i in page_indexes]
+
+
+@cached_extractor("pdf")
+def read_pdf(data: AttachmentData):
+    path = None
+    try:
+        source = as_bytes(data)
+        if len(source) > SPILL_TO_DISK_BYTES:
+            # Opened by path, PyMuPDF reads pages from the file on demand instead
+            # of holding another in-memory copy; workers get the path, not the bytes
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+                f.write(source)
+                path = f.name
+            source = path
+
+        with _open_pdf(source) as doc:
+            page_count = doc.page_count
+            if page_count <= PROCESS_PAGE_THRESHOLD:
+                return '\n'.join(page.get_text("text") for page in doc).strip()
+
+        # Large PDFs: one contiguous run of pages per worker process
+        run = -(-page_count // PAGE_WORKERS)
+        runs = [range(start, min(start + run, page_count)) for start in range(0, page_count, run)]
+
+        with ProcessPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+            parts = [text for texts in executor.map(_extract_pages, repeat(source), runs) for text in texts]
+
+        return '\n'.join(parts).strip()
+    except Exception as e:
+        return f"[Error reading PDF] {e}"
+    finally:
+        if path:
+            os.unlink(path)
+
+def read_pdf_from_b64(data_base64):
+    """Backward-compatible entry point for base64-encoded payloads"""
     try:
-        pdf_bytes = base64.urlsafe_b64decode(data_base64)
-        reader = PyPDF2.PdfReader(BytesIO(pdf_bytes))
-        text = ''
-        for page in reader.pages:
-            text += page.extract_text() + '\n'
-        return text.strip()
+        pdf_bytes = decode_b64(data_base64)
     except Exception as e:
         return f"[Error reading PDF] {e}"
+    return read_pdf(pdf_bytes)
@@ -1,17 +1,37 @@
-from pptx import Presentation
-import base64
-from io import BytesIO
+import re
+import zipfile
+from ._cache import cached_extractor
+from ._io import AttachmentData, as_stream, b64_to_spooled
 
-def read_pptx(data_base64):
+# DrawingML paragraph and text-run tags
+A_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+A_P = A_NS + 'p'
+A_T = A_NS + 't'
+SLIDE_NAME_RE = re.compile(r'ppt/slides/slide(\d+)\.xml')
+
+@cached_extractor("pptx")
+def read_pptx(data: AttachmentData):
+    try:
+        from lxml import etree  # Imported on first use
+        with zipfile.ZipFile(as_stream(data)) as z:
+            # Slide parts in presentation order (slide10 sorts after slide9)
+            slides = sorted((int(m.group(1)), name) for name in z.namelist()
+                            if (m := SLIDE_NAME_RE.fullmatch(name)))
+            parts = []
+            for _, name in slides:
+                # Read the slide XML directly - skips python-pptx's Slide/Shape/Run objects
+                tree = etree.fromstring(z.read(name))
+                parts.extend(''.join(t.text or '' for t in p.iter(A_T)) for p in tree.iter(A_P))
+        return '\n'.join(parts).strip()
+    except Exception as e:
+        return f"[Error reading PPTX] {e}"
+
+def read_pptx_from_b64(data_base64):
+    """Backward-compatible entry point for base64-encoded payloads"""
+    # Stream-decode into a spooled file - the parser reads it like any other file
     try:
-        ppt_bytes = base64.urlsafe_b64decode(data_base64)
-        ppt_file = BytesIO(ppt_bytes)
-        prs = Presentation(ppt_file)
-        text = ''
-        for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text += shape.text + '\n'
-        return text.strip()
+        spooled = b64_to_spooled(data_base64)
     except Exception as e:
         return f"[Error reading PPTX] {e}"
+    with spooled as f:
+        return read_pptx(f)
@@ -363,18 +363,55 @@
 
 # src/email_processing/fetch_emails.py
 
-import base64
+import re
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from src.auth.gmail_auth import authenticate_gmail
+from googleapiclient.errors import HttpError
+from src.auth.gmail_auth import authenticate_gmail, create_gmail_service, fetch_messages_batched
 from src.utils.logger import logger
 from src.storage.sqlite_manager import SQLiteManager, map_labels_to_category
 
+try:
+    # SIMD-accelerated drop-in for the stdlib decoder (AVX2/SSSE3/NEON)
+    from pybase64 import urlsafe_b64decode
+except ImportError:
+    from base64 import urlsafe_b64decode
+
 db = SQLiteManager()
 
+# Runs of whitespace (including \r and \n) collapsed to one space when cleaning content
+_WS_RE = re.compile(r'\s+')
+
+
+def _has_plain_alternative(part):
+    """True when a multipart/alternative part carries a non-empty text/plain child"""
+    return part.get("mimeType") == "multipart/alternative" and any(
+        sub.get("mimeType") == "text/plain" and sub.get("body", {}).get("data")
+        for sub in part.get("parts", ())
+    )
+
+
+def _b64decode(data):
+    """Decode Gmail's URL-safe base64, padding only when the length needs it"""
+    pad = -len(data) & 3
+    return urlsafe_b64decode(data + '=' * pad if pad else data)
+
+# Threads parsing fetched messages - attachment downloads are network-bound
+FETCH_WORKERS = 8
+
 class EmailFetcher:
     def __init__(self):
         self.service = None
+        # Gmail IDs already stored, loaded once and kept current as emails are stored
+        self._known_ids = None
+        # Gmail IDs that no longer exist (deleted between listing and fetching)
+        self._gone_ids = set()
+        # Worker pool plus one Gmail service per worker thread (httplib2 isn't thread-safe)
+        self._executor = None
+        self._thread_local = threading.local()
         self._authenticate()
 
     def _authenticate(self):
@@ -413,17 +450,56 @@ class EmailFetcher:
         if not text:
             return ""
         
-        # Remove excessive whitespace and normalize
-        text = ' '.join(text.split())
-        
-        # Remove common email artifacts
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
-        
-        return text.strip()
+        # Remove excessive whitespace and normalize in one pass - this also
+        # collapses \r\n / \r line endings, so no separate replace is needed
+        return _WS_RE.sub(' ', text).strip()
+
+    def _get_executor(self):
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="gmail-fetch")
+        return self._executor
+
+    def _thread_service(self):
+        """This worker thread's own Gmail service"""
+        service = getattr(self._thread_local, "service", None)
+        if service is None:
+            service = self._thread_local.service = create_gmail_service()
+        return service
+
+    def _parse_email_in_worker(self, gmail_id, full_msg):
+        """Worker entry point: parse one message, downloading its attachments"""
+        try:
+            return self._parse_email(full_msg, gmail_id, service=self._thread_service())
+        except Exception as e:
+            logger.error(f"❌ Failed to process email {gmail_id}: {e}")
+            return None
 
-    def fetch_email_batch(self, page_token=None, batch_size=50):
-        """Fetch one batch of emails with improved error handling and deduplication"""
+    def _get_known_ids(self):
+        """Stored Gmail IDs, queried once per fetcher instead of once per batch"""
+        if self._known_ids is None:
+            try:
+                db.cursor.execute("SELECT DISTINCT gmail_id FROM emails WHERE gmail_id IS NOT NULL")
+                self._known_ids = {row['gmail_id'] for row in db.cursor.fetchall()}
+            except Exception as e:
+                logger.warning(f"Could not fetch existing Gmail IDs: {e}")
+                # Don't cache the failure - try the query again next batch
+                return set()
+        return self._known_ids
+
+    def fetch_email_batch(self, page_token=None, batch_size=50, query=None):
+        """
+        Fetch one batch of emails with improved error handling and deduplication.
+        query is an optional Gmail search (e.g. "newer_than:7d") applied server-side.
+        """
         try:
+            # Without an incremental-sync checkpoint, take the mailbox's history id
+            # before listing: anything that arrives later shows up in history after it.
+            # (A message's own historyId is its latest change, not its arrival.)
+            seed_history_id = None
+            if not db.get_sync_metadata("last_history_id"):
+                seed_history_id = self._get_mailbox_history_id()
+
             params = {
                 "userId": "me",
                 "maxResults": batch_size,
@@ -431,61 +507,77 @@ class EmailFetcher:
             }
             if page_token and page_token.strip():
                 params["pageToken"] = page_token
+            if query:
+                params["q"] = query
 
             # First, get the list of message IDs
             results = self.service.users().messages().list(**params).execute()
             messages = results.get("messages", [])
             next_page_token = results.get("nextPageToken")
 
-            if not messages:
+            message_ids = [msg["id"] for msg in messages]
+            emails = self._process_message_ids(message_ids) if message_ids else []
+            if not message_ids:
                 logger.info("📭 No messages found in this batch")
-                return [], next_page_token
-
-            logger.info(f"📨 Processing {len(messages)} messages...")
 
-            emails = []
-            processed_count = 0
-            skipped_count = 0
-            
-            # Get existing Gmail IDs to avoid duplicates
-            existing_ids = set()
-            try:
-                db.cursor.execute("SELECT DISTINCT gmail_id FROM emails WHERE gmail_id IS NOT NULL")
-                existing_ids = {row['gmail_id'] for row in db.cursor.fetchall()}
-            except Exception as e:
-                logger.warning(f"Could not fetch existing Gmail IDs: {e}")
-            
-            for msg in messages:
-                try:
-                    gmail_id = msg["id"]
-                    
-                    # Skip if email already exists
-                    if gmail_id in existing_ids:
-                        skipped_count += 1
-                        continue
-                    
-                    email_data = self._process_email(gmail_id)
-                    if email_data:
-                        emails.append(email_data)
-                        processed_count += 1
-                        
-                        # Progress logging every 10 emails
-                        if processed_count % 10 == 0:
-                            logger.info(f"📊 Processed {processed_count}/{len(messages)} emails")
-                            
-                except Exception as e:
-                    logger.error(f"❌ Failed to process email {msg['id']}: {e}")
-                    continue
-
-            logger.info(f"✅ Successfully processed {len(emails)} new emails in batch (skipped {skipped_count} existing)")
+            # Seed only once the whole batch is stored, so no failed message is behind it
+            if seed_history_id and self._all_stored(message_ids):
+                self._seed_history_checkpoint(seed_history_id)
             return emails, next_page_token
             
         except Exception as e:
             logger.error(f"❌ Error fetching email batch: {e}")
             return [], None
 
+    def _process_message_ids(self, message_ids):
+        """Fetch, parse and store the given messages, skipping ones already stored"""
+        logger.info(f"📨 Processing {len(message_ids)} messages...")
+
+        emails = []
+        processed_count = 0
+        
+        # Get existing Gmail IDs to avoid duplicates
+        existing_ids = self._get_known_ids()
+
+        # Skip emails we already have, then fetch the rest with batched
+        # HTTP requests instead of one messages.get() round-trip each
+        new_ids = [msg_id for msg_id in message_ids if msg_id not in existing_ids]
+        skipped_count = len(message_ids) - len(new_ids)
+        full_msgs = fetch_messages_batched(self.service, new_ids) if new_ids else {}
+
+        # Failed inside the batch - retry each on its own
+        for gmail_id in new_ids:
+            if gmail_id not in full_msgs:
+                email_data = self._process_email(gmail_id)
+                if email_data:
+                    emails.append(email_data)
+                    existing_ids.add(gmail_id)
+
+        # Parse in worker threads so attachment downloads overlap; all
+        # SQLite work stays on this thread
+        parsed = []
+        results = self._get_executor().map(
+            self._parse_email_in_worker, full_msgs.keys(), full_msgs.values()
+        )
+        for parsed_email in results:
+            if parsed_email:
+                parsed.append(parsed_email)
+                processed_count += 1
+
+                # Progress logging every 10 emails
+                if processed_count % 10 == 0:
+                    logger.info(f"📊 Processed {processed_count}/{len(message_ids)} emails")
+
+        # Store the whole batch in one transaction
+        for email_data in self._store_emails(parsed):
+            emails.append(email_data)
+            existing_ids.add(email_data["gmail_id"])
+
+        logger.info(f"✅ Successfully processed {len(emails)} new emails in batch (skipped {skipped_count} existing)")
+        return emails
+
     def _process_email(self, email_id):
-        """Process single email with enhanced data extraction"""
+        """Fetch and process a single email"""
         try:
             # Fetch full message with all parts
             full_msg = self.service.users().messages().get(
@@ -493,20 +585,58 @@ class EmailFetcher:
                 id=email_id, 
                 format="full"
             ).execute()
+        except HttpError as e:
+            if e.resp.status == 404:
+                # Deleted since it was listed - nothing left to store
+                self._gone_ids.add(email_id)
+            logger.error(f"❌ Error fetching email {email_id}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Error fetching email {email_id}: {e}")
+            return None
 
-            # Extract headers
-            headers = {h["name"]: h["value"] for h in full_msg["payload"].get("headers", [])}
-            
+        return self._process_email_payload(full_msg, email_id)
+
+    def _process_email_payload(self, full_msg, email_id):
+        """Process and store a single already-fetched full message"""
+        parsed = self._parse_email(full_msg, email_id)
+        if parsed is None:
+            return None
+        stored = self._store_emails([parsed])
+        return stored[0] if stored else None
+
+    def _parse_email(self, full_msg, email_id, service=None):
+        """Extract email data and attachments from a full message (no database work)"""
+        try:
             # Core email data
-            subject = headers.get("Subject", "No Subject")
-            sender = headers.get("From", "Unknown Sender")
-            to_recipients = headers.get("To", "")
-            date = headers.get("Date", "Unknown Date")
+            subject = "No Subject"
+            sender = "Unknown Sender"
+            to_recipients = ""
+            date = "Unknown Date"
             
             # Additional headers for better categorization
-            cc_recipients = headers.get("Cc", "")
-            bcc_recipients = headers.get("Bcc", "")
-            reply_to = headers.get("Reply-To", "")
+            cc_recipients = ""
+            bcc_recipients = ""
+            reply_to = ""
+
+            # Extract headers in one pass, keeping only the ones we use.
+            # Header names are case-insensitive, so "FROM"/"from" match too
+            for header in full_msg["payload"].get("headers", ()):
+                name = header["name"].lower()
+                if name == "subject":
+                    subject = header["value"]
+                elif name == "from":
+                    sender = header["value"]
+                elif name == "to":
+                    to_recipients = header["value"]
+                elif name == "date":
+                    date = header["value"]
+                elif name == "cc":
+                    cc_recipients = header["value"]
+                elif name == "bcc":
+                    bcc_recipients = header["value"]
+                elif name == "reply-to":
+                    reply_to = header["value"]
             
             # Gmail metadata
             thread_id = full_msg.get("threadId")
@@ -521,155 +651,260 @@ class EmailFetcher:
             is_read = 0 if "UNREAD" in labels else 1
 
             # Extract body and attachments
-            body, attachments = self._extract_content_and_attachments(full_msg["payload"], email_id)
+            body, attachments = self._extract_content_and_attachments(full_msg["payload"], email_id, service)
             body = self._clean_email_content(body)
 
-            # Store in database with proper error handling
-            try:
-                db_email_id = db.upsert_email(
-                    gmail_id=email_id,
-                    thread_id=thread_id,
-                    history_id=history_id,
-                    sender=sender,
-                    to_recipients=to_recipients,
-                    subject=subject,
-                    date=date,
-                    snippet=snippet,
-                    body=body,
-                    category=category,
-                    labels=",".join(labels),
-                    is_read=is_read
-                )
-
-                # Store attachments
-                for att in attachments:
-                    try:
-                        db.insert_attachment(
-                            db_email_id,
-                            att["filename"],
-                            att.get("content"),
-                            att.get("content_preview"),
-                            att["size"]
-                        )
-                    except Exception as e:
-                        logger.warning(f"Failed to store attachment {att['filename']}: {e}")
-
-                logger.info(f"📩 Stored: {subject[:50]}... [{category}]")
-                
-                return {
-                    "id": db_email_id,
-                    "gmail_id": email_id,
-                    "thread_id": thread_id,
-                    "sender": sender,
-                    "to_recipients": to_recipients,
-                    "subject": subject,
-                    "date": date,
-                    "snippet": snippet,
-                    "body": body,
-                    "category": category,
-                    "labels": labels,
-                    "is_read": is_read,
-                    "attachments": len(attachments),
-                }
-            
-            except Exception as e:
-                logger.error(f"❌ Error storing email {email_id}: {e}")
-                return None
+            email_data = {
+                "id": None,  # Filled in once stored
+                "gmail_id": email_id,
+                "thread_id": thread_id,
+                "history_id": history_id,
+                "sender": sender,
+                "to_recipients": to_recipients,
+                "subject": subject,
+                "date": date,
+                "snippet": snippet,
+                "body": body,
+                "category": category,
+                "labels": labels,
+                "is_read": is_read,
+                "attachments": len(attachments),
+            }
+            return email_data, attachments
                 
         except Exception as e:
             logger.error(f"❌ Error processing email {email_id}: {e}")
             return None
 
-    def _extract_content_and_attachments(self, payload, msg_id):
+    def _store_emails(self, parsed):
+        """
+        Store parsed (email_data, attachments) pairs in a single transaction:
+        one executemany for the emails and one for their attachments, so a
+        whole batch costs one commit instead of one per email and attachment.
+        Returns the stored email_data dicts with their local ids set.
+        """
+        if not parsed:
+            return []
+
+        try:
+            with db.conn:
+                id_map = db.upsert_emails_many([
+                    {
+                        "gmail_id": email_data["gmail_id"],
+                        "thread_id": email_data["thread_id"],
+                        "history_id": email_data["history_id"],
+                        "sender": email_data["sender"],
+                        "to_recipients": email_data["to_recipients"],
+                        "subject": email_data["subject"],
+                        "date": email_data["date"],
+                        "snippet": email_data["snippet"],
+                        "body": email_data["body"],
+                        "category": email_data["category"],
+                        "labels": ",".join(email_data["labels"]),
+                        "is_read": email_data["is_read"],
+                    }
+                    for email_data, _ in parsed
+                ])
+                db.insert_attachments_many([
+                    (
+                        id_map[email_data["gmail_id"]],
+                        att["filename"],
+                        att.get("content"),
+                        att.get("content_preview"),
+                        att["size"],
+                    )
+                    for email_data, attachments in parsed
+                    for att in attachments
+                ])
+        except Exception as e:
+            logger.error(f"❌ Error storing {len(parsed)} emails: {e}")
+            return []
+
+        stored = []
+        for email_data, _ in parsed:
+            email_data["id"] = id_map[email_data["gmail_id"]]
+            logger.info(f"📩 Stored: {email_data['subject'][:50]}... [{email_data['category']}]")
+            stored.append(email_data)
+        return stored
+
+    def _advance_history_checkpoint(self, history_id):
+        """Move the last_history_id checkpoint forward (never back)"""
+        if not history_id:
+            return
+        try:
+            current = db.get_sync_metadata("last_history_id")
+            if not current or int(history_id) > int(current):
+                db.update_sync_metadata("last_history_id", str(history_id))
+        except Exception as e:
+            logger.warning(f"Could not update history checkpoint: {e}")
+
+    def _seed_history_checkpoint(self, history_id):
+        """Set the first last_history_id checkpoint; later moves go through sync_recent_emails"""
+        try:
+            if not db.get_sync_metadata("last_history_id"):
+                db.update_sync_metadata("last_history_id", str(history_id))
+        except Exception as e:
+            logger.warning(f"Could not seed history checkpoint: {e}")
+
+    def _get_mailbox_history_id(self):
+        """The mailbox's current historyId, or None if it can't be fetched"""
+        try:
+            return self.service.users().getProfile(userId="me").execute().get("historyId")
+        except Exception as e:
+            logger.warning(f"Could not fetch mailbox history id: {e}")
+            return None
+
+    def _all_stored(self, message_ids):
+        """True when every id is stored (or was already known) locally, or was deleted in Gmail"""
+        known_ids = self._get_known_ids()
+        return all(msg_id in known_ids or msg_id in self._gone_ids for msg_id in message_ids)
+
+    def _get_added_message_ids(self, start_history_id):
+        """
+        IDs of messages added since start_history_id, via users.history.list.
+        Returns (message_ids, latest mailbox history id).
+        """
+        message_ids = {}  # Ordered set
+        latest_history_id = None
+        params = {
+            "userId": "me",
+            "startHistoryId": start_history_id,
+            "historyTypes": ["messageAdded"],
+            "maxResults": 500,
+        }
+
+        while True:
+            results = self.service.users().history().list(**params).execute()
+            latest_history_id = results.get("historyId", latest_history_id)
+
+            for record in results.get("history", []):
+                for added in record.get("messagesAdded", []):
+                    message = added["message"]
+                    labels = message.get("labelIds", [])
+                    # Match messages.list(includeSpamTrash=False)
+                    if "SPAM" in labels or "TRASH" in labels:
+                        continue
+                    message_ids[message["id"]] = None
+
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+            params["pageToken"] = page_token
+
+        return list(message_ids), latest_history_id
+
+    def _fetch_attachment(self, service, msg_id, attachment_id, max_retries=3):
+        """Fetch one attachment with retry logic"""
+        for retry in range(max_retries):
+            try:
+                return service.users().messages().attachments().get(
+                    userId="me", 
+                    messageId=msg_id, 
+                    id=attachment_id
+                ).execute()
+            except Exception as e:
+                if retry == max_retries - 1:
+                    raise e
+                time.sleep(1)  # Wait before retry
+
+    def _extract_content_and_attachments(self, payload, msg_id, service=None):
         """Enhanced content and attachment extraction with better error handling"""
+        service = service or self.service
         body_parts = []
         attachments = []
+        pending = []  # (filename, mime_type, attachment_id) to fetch
         
-        def process_part(part):
+        # Walk the MIME tree with an explicit stack instead of recursion. Each
+        # entry carries whether its HTML alternative is redundant; children are
+        # pushed reversed so parts are still visited in document order
+        stack = deque([(payload, False)])
+        while stack:
+            part, skip_html = stack.pop()
             try:
                 mime_type = part.get("mimeType", "")
                 body_data = part.get("body", {})
                 
-                # Handle text content
-                if mime_type in ["text/plain", "text/html"]:
+                # Handle text content - the HTML alternative is skipped (never
+                # decoded) when a plain-text sibling says the same thing
+                if mime_type == "text/plain" or (mime_type == "text/html" and not skip_html):
                     data = body_data.get("data")
                     if data:
                         try:
-                            decoded = base64.urlsafe_b64decode(data + '===').decode("utf-8", errors="ignore")
+                            decoded = _b64decode(data).decode("utf-8", errors="ignore")
                             body_parts.append(decoded)
                         except Exception as e:
                             logger.warning(f"Failed to decode body part: {e}")
                 
-                # Handle attachments
+                # Collect attachments - they're fetched together after the walk
                 attachment_id = body_data.get("attachmentId")
                 filename = part.get("filename", "")
                 
                 if attachment_id and filename:
-                    try:
-                        # Fetch attachment with retry logic
-                        max_retries = 3
-                        for retry in range(max_retries):
-                            try:
-                                att_data = self.service.users().messages().attachments().get(
-                                    userId="me", 
-                                    messageId=msg_id, 
-                                    id=attachment_id
-                                ).execute()
-                                break
-                            except Exception as e:
-                                if retry == max_retries - 1:
-                                    raise e
-                                time.sleep(1)  # Wait before retry
-                        
-                        raw_data = base64.urlsafe_b64decode(att_data["data"] + '===')
-                        
-                        # Create preview for text-based files
-                        preview = ""
-                        if filename.lower().endswith(('.txt', '.csv', '.json', '.xml', '.log')):
-                            try:
-                                preview = raw_data[:1000].decode("utf-8", errors="ignore")
-                            except:
-                                preview = "Binary file - no preview available"
-                        
-                        attachments.append({
-                            "filename": filename,
-                            "size": len(raw_data),
-                            "content": raw_data,
-                            "content_preview": preview,
-                            "mime_type": mime_type
-                        })
-                        
-                        logger.info(f"📎 Attachment: {filename} ({len(raw_data)} bytes)")
-                        
-                    except Exception as e:
-                        logger.warning(f"Failed to fetch attachment {filename}: {e}")
-                        # Store attachment metadata even if content fetch fails
-                        attachments.append({
-                            "filename": filename,
-                            "size": 0,
-                            "content": None,
-                            "content_preview": "Failed to fetch attachment content",
-                            "mime_type": mime_type
-                        })
+                    pending.append((filename, mime_type, attachment_id))
                 
-                # Process nested parts
-                if "parts" in part:
-                    for subpart in part["parts"]:
-                        process_part(subpart)
+                # Queue nested parts
+                subparts = part.get("parts")
+                if subparts:
+                    skip_sub_html = _has_plain_alternative(part)
+                    stack.extend((subpart, skip_sub_html) for subpart in reversed(subparts))
                         
             except Exception as e:
                 logger.warning(f"Error processing email part: {e}")
 
-        # Start processing
-        try:
-            if "parts" in payload:
-                for part in payload["parts"]:
-                    process_part(part)
-            else:
-                # Single part message
-                process_part(payload)
-        except Exception as e:
-            logger.error(f"Error processing email payload: {e}")
+        # Fetch every attachment of the message in one batched HTTP request
+        fetched = {}
+        if pending:
+            def on_attachment(request_id, response, exception):
+                if exception is None:
+                    fetched[request_id] = response
+
+            try:
+                batch = service.new_batch_http_request(callback=on_attachment)
+                for index, (_, _, attachment_id) in enumerate(pending):
+                    batch.add(
+                        service.users().messages().attachments().get(
+                            userId="me", messageId=msg_id, id=attachment_id
+                        ),
+                        request_id=str(index),
+                    )
+                batch.execute()
+            except Exception as e:
+                logger.warning(f"Batched attachment fetch failed for {msg_id}: {e}")
+
+        for index, (filename, mime_type, attachment_id) in enumerate(pending):
+            try:
+                # Anything the batch didn't return is fetched on its own, with retries
+                att_data = fetched.get(str(index)) or self._fetch_attachment(service, msg_id, attachment_id)
+                raw_data = _b64decode(att_data["data"])
+                
+                # Create preview for text-based files
+                preview = ""
+                if filename.lower().endswith(('.txt', '.csv', '.json', '.xml', '.log')):
+                    try:
+                        preview = raw_data[:1000].decode("utf-8", errors="ignore")
+                    except:
+                        preview = "Binary file - no preview available"
+                
+                attachments.append({
+                    "filename": filename,
+                    "size": len(raw_data),
+                    "content": raw_data,
+                    "content_preview": preview,
+                    "mime_type": mime_type
+                })
+                
+                logger.info(f"📎 Attachment: {filename} ({len(raw_data)} bytes)")
+                
+            except Exception as e:
+                logger.warning(f"Failed to fetch attachment {filename}: {e}")
+                # Store attachment metadata even if content fetch fails
+                attachments.append({
+                    "filename": filename,
+                    "size": 0,
+                    "content": None,
+                    "content_preview": "Failed to fetch attachment content",
+                    "mime_type": mime_type
+                })
 
         # Combine body parts
         combined_body = "\n\n".join(body_parts) if body_parts else ""
@@ -739,13 +974,52 @@ class EmailFetcher:
     def sync_recent_emails(self, days_back=7):
         """Sync only recent emails for quick updates"""
         logger.info(f"🔄 Syncing emails from last {days_back} days...")
+
+        # Incremental sync: only messages added since the last checkpoint
+        history_expired = False
+        last_history_id = db.get_sync_metadata("last_history_id")
+        if last_history_id:
+            try:
+                message_ids, latest_history_id = self._get_added_message_ids(last_history_id)
+                emails = self._process_message_ids(message_ids) if message_ids else []
+
+                # Only move past these changes once every message is stored -
+                # otherwise the next sync must see them again
+                if self._all_stored(message_ids):
+                    self._advance_history_checkpoint(latest_history_id)
+                else:
+                    logger.warning(f"⚠️ Some new messages weren't stored, keeping history checkpoint {last_history_id}")
+                db.update_sync_metadata("last_sync_time", str(int(time.time())))
+
+                logger.info(f"✅ Incremental sync complete: {len(emails)} new emails")
+                return len(emails)
+            except HttpError as e:
+                # Gmail only keeps history for a limited time (404 once expired) - rescan below
+                history_expired = e.resp.status == 404
+                logger.warning(f"⚠️ Incremental sync from history {last_history_id} failed ({e}), falling back to a rescan")
+            except Exception as e:
+                logger.warning(f"⚠️ Incremental sync from history {last_history_id} failed ({e}), falling back to a rescan")
+
+        # An expired checkpoint is replaced by the mailbox's history id from
+        # before the rescan, so later syncs don't keep hitting the 404
+        rescan_history_id = self._get_mailbox_history_id() if history_expired else None
         
-        # This would require date-based filtering in Gmail API
-        # For now, just fetch a smaller batch
-        emails, _ = self.fetch_email_batch(batch_size=50)
+        # Let Gmail filter by date server-side and page through just the matches
+        query = f"newer_than:{days_back}d"
+        total_synced = 0
+        page_token = None
+        while True:
+            emails, page_token = self.fetch_email_batch(page_token, batch_size=500, query=query)
+            total_synced += len(emails)
+            if not page_token:
+                break
+
+        if history_expired:
+            # Without a fresh id, clear it so the next fully stored batch seeds a new one
+            db.update_sync_metadata("last_history_id", str(rescan_history_id or ""))
         
-        logger.info(f"✅ Recent sync complete: {len(emails)} emails")
-        return len(emails)
+        logger.info(f"✅ Recent sync complete: {total_synced} emails")
+        return total_synced
 
     def get_sync_status(self):
         """Get current synchronization status"""
@@ -8,6 +8,37 @@ from typing import List, Dict, Optional, Tuple, Any
 DB_PATH = Path("storage/mailmind.db")
 DB_PATH.parent.mkdir(exist_ok=True)
 
+UPSERT_EMAIL_SQL = """
+    INSERT INTO emails (
+        gmail_id, thread_id, history_id, sender, to_recipients,
+        subject, date, snippet, body, labels, category, is_read, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(gmail_id) DO UPDATE SET
+        thread_id = excluded.thread_id,
+        history_id = excluded.history_id,
+        sender = excluded.sender,
+        to_recipients = excluded.to_recipients,
+        subject = excluded.subject,
+        date = excluded.date,
+        snippet = excluded.snippet,
+        body = excluded.body,
+        labels = excluded.labels,
+        category = excluded.category,
+        is_read = CASE
+            WHEN excluded.is_read IS NOT NULL THEN excluded.is_read
+            ELSE emails.is_read
+        END,
+        updated_at = CURRENT_TIMESTAMP;
+"""
+
+INSERT_ATTACHMENT_SQL = """
+    INSERT INTO attachments (email_id, filename, size, content_preview, content)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(email_id, filename, size) DO UPDATE SET
+        content_preview = COALESCE(excluded.content_preview, attachments.content_preview),
+        content = COALESCE(excluded.content, attachments.content);
+"""
+
 
 class SQLiteManager:
     """
@@ -23,6 +54,7 @@ class SQLiteManager:
 
     _instance = None
     _lock = threading.Lock()
+    _readers = threading.local()
 
     def __new__(cls):
         with cls._lock:
@@ -31,6 +63,7 @@ class SQLiteManager:
                 cls._instance.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
                 cls._instance.conn.row_factory = sqlite3.Row
                 cls._instance.cursor = cls._instance.conn.cursor()
+                cls._instance._configure_pragmas()
                 cls._instance._create_tables()
                 cls._instance._enable_foreign_keys()
             return cls._instance
@@ -38,6 +71,32 @@ class SQLiteManager:
     # ---------------------------------------------------------------------
     # Schema
     # ---------------------------------------------------------------------
+    def _configure_pragmas(self):
+        """Tune SQLite for a mixed read/write workload.
+
+        WAL lets readers (dashboard stats) run alongside write batches, and
+        synchronous=NORMAL is safe under WAL while avoiding an fsync per commit.
+        """
+        self.cursor.execute("PRAGMA journal_mode = WAL;")
+        self.cursor.execute("PRAGMA synchronous = NORMAL;")
+        self.cursor.execute("PRAGMA temp_store = MEMORY;")
+        self.cursor.execute("PRAGMA cache_size = -65536;")     # 64 MB page cache
+        self.cursor.execute("PRAGMA mmap_size = 268435456;")   # 256 MB memory-mapped I/O
+
+    def read_connection(self) -> sqlite3.Connection:
+        """Return this thread's read-only connection.
+
+        Under WAL these readers see the last committed snapshot and never
+        block on (or serialize behind) the shared writer connection.
+        """
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{DB_PATH.resolve()}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA mmap_size = 268435456;")
+            self._readers.conn = conn
+        return conn
+
     def _enable_foreign_keys(self):
         self.cursor.execute("PRAGMA foreign_keys = ON;")
         self.conn.commit()
@@ -140,6 +199,39 @@ class SQLiteManager:
     # ---------------------------------------------------------------------
     # Email & Attachment Upserts
     # ---------------------------------------------------------------------
+    @staticmethod
+    def _email_params(
+        *,
+        gmail_id: str,
+        thread_id: Optional[str],
+        history_id: Optional[str],
+        sender: str,
+        to_recipients: str,
+        subject: str,
+        date: str,
+        snippet: str,
+        body: str,
+        labels: str,
+        category: str,
+        is_read: Optional[int] = None,
+    ) -> Tuple:
+        """Normalize upsert_email's fields into UPSERT_EMAIL_SQL parameters"""
+        is_read_val = 1 if (is_read and int(is_read) == 1) else 0
+        return (
+            gmail_id,
+            thread_id,
+            history_id,
+            sender,
+            to_recipients or "",
+            subject,
+            date,
+            snippet,
+            body,
+            labels or "",
+            category or "Other",
+            is_read_val,
+        )
+
     def upsert_email(
         self,
         *,
@@ -159,47 +251,21 @@ class SQLiteManager:
         """
         Insert or update an email by gmail_id. Returns local email id.
         """
-        labels = labels or ""
-        to_recipients = to_recipients or ""
-        category = category or "Other"
-        is_read_val = 1 if (is_read and int(is_read) == 1) else 0
-
         self.cursor.execute(
-            """
-            INSERT INTO emails (
-                gmail_id, thread_id, history_id, sender, to_recipients,
-                subject, date, snippet, body, labels, category, is_read, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(gmail_id) DO UPDATE SET
-                thread_id = excluded.thread_id,
-                history_id = excluded.history_id,
-                sender = excluded.sender,
-                to_recipients = excluded.to_recipients,
-                subject = excluded.subject,
-                date = excluded.date,
-                snippet = excluded.snippet,
-                body = excluded.body,
-                labels = excluded.labels,
-                category = excluded.category,
-                is_read = CASE
-                    WHEN excluded.is_read IS NOT NULL THEN excluded.is_read
-                    ELSE emails.is_read
-                END,
-                updated_at = CURRENT_TIMESTAMP;
-            """,
-            (
-                gmail_id,
-                thread_id,
-                history_id,
-                sender,
-                to_recipients,
-                subject,
-                date,
-                snippet,
-                body,
-                labels,
-                category,
-                is_read_val,
+            UPSERT_EMAIL_SQL,
+            self._email_params(
+                gmail_id=gmail_id,
+                thread_id=thread_id,
+                history_id=history_id,
+                sender=sender,
+                to_recipients=to_recipients,
+                subject=subject,
+                date=date,
+                snippet=snippet,
+                body=body,
+                labels=labels,
+                category=category,
+                is_read=is_read,
             ),
         )
         self.conn.commit()
@@ -218,13 +284,7 @@ class SQLiteManager:
         try:
             size = size if size is not None else (len(content) if content else 0)
             self.cursor.execute(
-                """
-                INSERT INTO attachments (email_id, filename, size, content_preview, content)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(email_id, filename, size) DO UPDATE SET
-                    content_preview = COALESCE(excluded.content_preview, attachments.content_preview),
-                    content = COALESCE(excluded.content, attachments.content);
-                """,
+                INSERT_ATTACHMENT_SQL,
                 (email_id, filename or "unknown", size, content_preview or "", content),
             )
             self.conn.commit()
@@ -238,6 +298,37 @@ class SQLiteManager:
             print(f"Error inserting attachment: {e}")
             return None
 
+    def upsert_emails_many(self, emails: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Upsert a batch of emails (dicts of upsert_email's fields) with one executemany.
+        Doesn't commit - wrap the call in `with db.conn:` so the batch is a single
+        transaction. Returns gmail_id -> local email id.
+        """
+        if not emails:
+            return {}
+        self.cursor.executemany(UPSERT_EMAIL_SQL, [self._email_params(**email) for email in emails])
+
+        gmail_ids = [email["gmail_id"] for email in emails]
+        placeholders = ",".join("?" * len(gmail_ids))
+        self.cursor.execute(f"SELECT id, gmail_id FROM emails WHERE gmail_id IN ({placeholders});", gmail_ids)
+        return {row["gmail_id"]: int(row["id"]) for row in self.cursor.fetchall()}
+
+    def insert_attachments_many(self, attachments: List[Tuple]) -> None:
+        """
+        Insert a batch of attachments given as insert_attachment's
+        (email_id, filename, content, content_preview, size) tuples.
+        Doesn't commit - see upsert_emails_many.
+        """
+        self.cursor.executemany(
+            INSERT_ATTACHMENT_SQL,
+            [
+                (email_id, filename or "unknown",
+                 size if size is not None else (len(content) if content else 0),
+                 content_preview or "", content)
+                for email_id, filename, content, content_preview, size in attachments
+            ],
+        )
+
     # ---------------------------------------------------------------------
     # Reads / Stats / Filters
     # ---------------------------------------------------------------------
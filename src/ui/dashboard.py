@@ -7,16 +7,31 @@ import time
 import json
 from datetime import datetime, timedelta
 import re
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
 
 from src.storage.sqlite_manager import SQLiteManager
 from src.email_processing.fetch_emails import email_fetcher
-from src.ai_analysis.ai_analyzer import ai_analyzer, EmailAnalysis
-from src.ai_analysis.email_reply import email_reply_system
-from src.ai_analysis.email_summarizer import email_summarizer  # Import the summarizer
+from src.ai_analysis.ai_analyzer import get_ai_analyzer as _create_ai_analyzer, EmailAnalysis
+from src.ai_analysis.email_reply import get_email_reply_system as _create_email_reply_system
+from src.ai_analysis.email_summarizer import get_email_summarizer as _create_email_summarizer
 
 db = SQLiteManager()
 
+@st.cache_resource
+def get_ai_analyzer():
+    """Shared AI analyzer that persists across Streamlit reruns"""
+    return _create_ai_analyzer()
+
+@st.cache_resource
+def get_email_reply_system():
+    """Shared reply system that persists across Streamlit reruns"""
+    return _create_email_reply_system()
+
+@st.cache_resource
+def get_email_summarizer():
+    """Shared email summarizer that persists across Streamlit reruns"""
+    return _create_email_summarizer()
+
 class EmailDashboard:
     def __init__(self):
         self._init_state()
@@ -54,17 +69,19 @@ class EmailDashboard:
             return "", ""
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            try:
+                soup = BeautifulSoup(html_content, 'lxml')
+            except FeatureNotFound:
+                # lxml not installed - fall back to the pure-Python parser
+                soup = BeautifulSoup(html_content, 'html.parser')
             
             # Remove script and style elements
             for script in soup(["script", "style"]):
                 script.decompose()
             
             # Get plain text
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            plain_text = ' '.join(chunk for chunk in chunks if chunk)
+            text = soup.get_text(separator=' ', strip=True)
+            plain_text = ' '.join(text.split())
             
             # Get formatted HTML (preserve some formatting)
             formatted_html = str(soup)
@@ -168,12 +185,12 @@ class EmailDashboard:
         unread_count = db.get_unread_count()
         
         # AI Analysis stats
-        ai_stats = ai_analyzer.get_analysis_stats()
+        ai_stats = get_ai_analyzer().get_analysis_stats()
         analyzed_count = ai_stats.get('total_analyzed', 0)
         completion_rate = ai_stats.get('analysis_completion_rate', 0)
         
         # AI Summarization stats
-        summary_stats = email_summarizer.get_summary_stats()
+        summary_stats = get_email_summarizer().get_summary_stats()
         summarized_count = summary_stats.get('total_emails_summarized', 0)
         summary_completion_rate = summary_stats.get('summarization_completion_rate', 0)
         
@@ -313,7 +330,7 @@ class EmailDashboard:
             progress_bar.progress(0.1)
             
             # Summarize batch of emails
-            results = email_summarizer.batch_summarize_emails(limit=10)
+            results = get_email_summarizer().batch_summarize_emails(limit=10)
             
             progress_bar.progress(0.8)
             
@@ -348,7 +365,7 @@ class EmailDashboard:
             progress_bar.progress(0.1)
             
             # Analyze batch of emails
-            results = ai_analyzer.batch_analyze_emails(limit=10)
+            results = get_ai_analyzer().batch_analyze_emails(limit=10)
             
             progress_bar.progress(0.8)
             
@@ -371,8 +388,8 @@ class EmailDashboard:
 
     def show_ai_stats_modal(self):
         """Show comprehensive AI statistics"""
-        stats = ai_analyzer.get_analysis_stats()
-        summary_stats = email_summarizer.get_summary_stats()
+        stats = get_ai_analyzer().get_analysis_stats()
+        summary_stats = get_email_summarizer().get_summary_stats()
         
         st.sidebar.markdown("---")
         st.sidebar.markdown("### 🤖 AI Statistics")
@@ -484,10 +501,10 @@ class EmailDashboard:
             pass
 
         # Get AI summaries
-        summaries = email_summarizer.get_email_summaries(email_id)
+        summaries = get_email_summarizer().get_email_summaries(email_id)
 
         # Get replies for this email
-        replies = email_reply_system.get_replies_for_email(email_id)
+        replies = get_email_reply_system().get_replies_for_email(email_id)
 
         # Create a modal-like experience with improved layout
         st.markdown("---")
@@ -742,7 +759,7 @@ class EmailDashboard:
         with col_gen1:
             if st.button("📝 Generate Summary", key="generate_summary", type="primary", use_container_width=True):
                 with st.spinner("📝 Generating AI summary..."):
-                    summary = email_summarizer.summarize_email(email_data, selected_type)
+                    summary = get_email_summarizer().summarize_email(email_data, selected_type)
                     if summary:
                         st.success("✅ Summary generated successfully!")
                         time.sleep(1)
@@ -752,14 +769,14 @@ class EmailDashboard:
         
         with col_gen2:
             if st.button("📊 View All", key="view_all_summaries"):
-                existing_summaries = email_summarizer.get_email_summaries(email_id)
+                existing_summaries = get_email_summarizer().get_email_summaries(email_id)
                 if existing_summaries:
                     st.session_state.show_all_summaries = True
                 else:
                     st.info("No existing summaries found")
         
         # Show existing summaries if any
-        existing_summaries = email_summarizer.get_email_summaries(email_id)
+        existing_summaries = get_email_summarizer().get_email_summaries(email_id)
         if existing_summaries:
             st.markdown("### 📄 Existing Summaries")
             for summary in existing_summaries:
@@ -813,13 +830,15 @@ class EmailDashboard:
         
         with col_gen1:
             if st.button("🤖 Generate AI Reply", key="generate_reply", type="primary", use_container_width=True):
-                with st.spinner("🤖 Generating intelligent reply..."):
-                    reply_content = email_reply_system.generate_ai_reply(email_data, selected_type)
-                    if reply_content:
-                        st.session_state.generated_reply = reply_content
-                        st.success("✅ Reply generated successfully!")
-                    else:
-                        st.error("❌ Failed to generate reply")
+                # Stream tokens into the page as Gemini produces them
+                reply_content = st.write_stream(
+                    get_email_reply_system().generate_ai_reply_stream(email_data, selected_type)
+                )
+                if reply_content:
+                    st.session_state.generated_reply = reply_content.strip()
+                    st.success("✅ Reply generated successfully!")
+                else:
+                    st.error("❌ Failed to generate reply")
         
         with col_gen2:
             if st.button("🧹 Clear Reply", key="clear_reply"):
@@ -862,7 +881,7 @@ class EmailDashboard:
             with col_act1:
                 if st.button("📄 Create Draft", key="create_draft", type="secondary", use_container_width=True):
                     with st.spinner("Creating draft in Gmail..."):
-                        draft_id = email_reply_system.create_reply_draft(
+                        draft_id = get_email_reply_system().create_reply_draft(
                             email_data, st.session_state.generated_reply, 'ai_generated'
                         )
                         if draft_id:
@@ -874,7 +893,7 @@ class EmailDashboard:
                 if st.button("📤 Send Reply", key="send_reply", type="primary", use_container_width=True):
                     if st.session_state.get("confirm_send", False):
                         with st.spinner("Sending reply..."):
-                            reply_id = email_reply_system.send_reply(
+                            reply_id = get_email_reply_system().send_reply(
                                 email_data, st.session_state.generated_reply, 'ai_generated'
                             )
                             if reply_id:
@@ -893,7 +912,7 @@ class EmailDashboard:
             with col_act3:
                 if st.button("🔄 Regenerate", key="regenerate_reply", use_container_width=True):
                     with st.spinner("Regenerating reply..."):
-                        new_reply = email_reply_system.generate_ai_reply(email_data, selected_type)
+                        new_reply = get_email_reply_system().generate_ai_reply(email_data, selected_type, use_cache=False)
                         if new_reply:
                             st.session_state.generated_reply = new_reply
                             st.success("✅ Reply regenerated!")
@@ -1025,7 +1044,7 @@ class EmailDashboard:
             # Get AI summary if available
             summaries = []
             if st.session_state.show_ai_summary:
-                summaries = email_summarizer.get_email_summaries(email_id)
+                summaries = get_email_summarizer().get_email_summaries(email_id)
 
             # Determine email styling
             unread_class = "email-unread" if not is_read else ""
@@ -1123,9 +1142,9 @@ class EmailDashboard:
                 with col6:
                     if st.button("Draft", key=f"draft_{tab_name}_{email_id}_{i}", help="Quick draft reply"):
                         with st.spinner("Creating draft..."):
-                            reply_content = email_reply_system.generate_ai_reply(dict(email), "acknowledge")
+                            reply_content = get_email_reply_system().generate_ai_reply(dict(email), "acknowledge")
                             if reply_content:
-                                draft_id = email_reply_system.create_reply_draft(dict(email), reply_content, 'ai_generated')
+                                draft_id = get_email_reply_system().create_reply_draft(dict(email), reply_content, 'ai_generated')
                                 if draft_id:
                                     st.success("✅ Draft created!")
                                 else:
@@ -1139,7 +1158,7 @@ class EmailDashboard:
     def _analyze_single_email(self, email_id: int, email_data: dict):
         """Analyze a single email with enhanced feedback"""
         with st.spinner("🤖 Analyzing email with AI..."):
-            analysis = ai_analyzer.analyze_email(email_data)
+            analysis = get_ai_analyzer().analyze_email(email_data)
             if analysis:
                 st.success("✅ Email analyzed successfully!")
                 st.info(f"Priority: {analysis.priority_score}/5 | Sentiment: {analysis.sentiment}")
@@ -1151,7 +1170,7 @@ class EmailDashboard:
     def _summarize_single_email(self, email_id: int, email_data: dict):
         """Summarize a single email with enhanced feedback"""
         with st.spinner("📝 Summarizing email with AI..."):
-            summary = email_summarizer.summarize_email(email_data, "detailed")
+            summary = get_email_summarizer().summarize_email(email_data, "detailed")
             if summary:
                 st.success("✅ Email summarized successfully!")
                 st.info(f"Summary: {summary.compression_ratio}% compression | {len(summary.key_points)} key points")
@@ -1255,9 +1274,9 @@ class EmailDashboard:
         else:
             # Get comprehensive stats
             unread = db.get_unread_count()
-            ai_stats = ai_analyzer.get_analysis_stats()
-            summary_stats = email_summarizer.get_summary_stats()
-            reply_stats = email_reply_system.get_reply_stats()
+            ai_stats = get_ai_analyzer().get_analysis_stats()
+            summary_stats = get_email_summarizer().get_summary_stats()
+            reply_stats = get_email_reply_system().get_reply_stats()
             
             # Display stats in columns
             col_s1, col_s2, col_s3, col_s4, col_s5, col_s6 = st.columns(6)
@@ -1276,7 +1295,7 @@ class EmailDashboard:
                 st.metric("↩️ Replies Sent", reply_stats.get('total_replies_sent', 0))
 
         # High Priority Alert with AI integration
-        high_priority_emails = ai_analyzer.get_high_priority_emails(5)
+        high_priority_emails = get_ai_analyzer().get_high_priority_emails(5)
         if high_priority_emails:
             st.warning(f"🔴 **{len(high_priority_emails)} high-priority emails need your attention!**")
             
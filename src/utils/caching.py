@@ -0,0 +1,132 @@
+# src/utils/caching.py
+
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Default embedding model used for semantic cache keys
+EMBEDDING_MODEL = "models/text-embedding-004"
+
+
+class SemanticCache:
+    """Cache LLM outputs keyed by embedding similarity of the prompt content.
+
+    Embeddings and serialized payloads live in a SQLite table; the embedding
+    matrix is kept in memory (L2-normalized) so a lookup is one dot product.
+    Cache failures never break the caller - they just behave like a miss.
+    """
+
+    def __init__(self, db, table: str = "cached_analyses", threshold: float = 0.92,
+                 embedding_model: str = EMBEDDING_MODEL):
+        self.db = db
+        self.table = table
+        self.threshold = threshold
+        self.embedding_model = embedding_model
+        self._embedder = None
+        self._lock = threading.Lock()
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._payloads: List[str] = []
+
+        self._create_table()
+        self._load()
+
+    def _create_table(self):
+        """Create the cache table if it doesn't exist"""
+        try:
+            self.db.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    embedding BLOB NOT NULL,
+                    analysis_json TEXT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+            self.db.conn.commit()
+        except Exception as e:
+            logger.error(f"❌ Failed to create semantic cache table {self.table}: {e}")
+
+    def _load(self):
+        """Load cached embeddings into an in-memory matrix"""
+        try:
+            rows = self.db.conn.execute(
+                f"SELECT embedding, analysis_json FROM {self.table} ORDER BY id"
+            ).fetchall()
+        except Exception as e:
+            logger.error(f"❌ Failed to load semantic cache: {e}")
+            return
+
+        if rows:
+            self._matrix = np.vstack([np.frombuffer(row[0], dtype=np.float32) for row in rows])
+            self._payloads = [row[1] for row in rows]
+        logger.info(f"✅ Semantic cache '{self.table}' loaded with {len(self._payloads)} entries")
+
+    def _get_embedder(self):
+        """Create the embedding client on first use"""
+        if self._embedder is None:
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+            self._embedder = GoogleGenerativeAIEmbeddings(model=self.embedding_model)
+        return self._embedder
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed text for a cache lookup, or None if embedding fails"""
+        try:
+            return self._normalize(self._get_embedder().embed_query(text))
+        except Exception as e:
+            logger.warning(f"⚠️ Semantic cache embedding failed: {e}")
+            return None
+
+    async def aembed(self, text: str) -> Optional[np.ndarray]:
+        """Async variant of embed"""
+        try:
+            return self._normalize(await self._get_embedder().aembed_query(text))
+        except Exception as e:
+            logger.warning(f"⚠️ Semantic cache embedding failed: {e}")
+            return None
+
+    def lookup(self, embedding: Optional[np.ndarray]) -> Optional[str]:
+        """Return the cached payload of the most similar entry above the threshold"""
+        if embedding is None:
+            return None
+
+        with self._lock:
+            if not self._payloads or self._matrix.shape[1] != embedding.shape[0]:
+                return None
+            scores = self._matrix @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            logger.info(f"🎯 Semantic cache hit (similarity {scores[best]:.3f})")
+            return self._payloads[best]
+
+    def add(self, embedding: Optional[np.ndarray], payload: str):
+        """Store a payload under its embedding"""
+        if embedding is None:
+            return
+
+        try:
+            with self._lock:
+                self.db.conn.execute(
+                    f"INSERT INTO {self.table} (embedding, analysis_json) VALUES (?, ?)",
+                    (embedding.tobytes(), payload)
+                )
+                self.db.conn.commit()
+
+                if self._payloads and self._matrix.shape[1] == embedding.shape[0]:
+                    self._matrix = np.vstack([self._matrix, embedding])
+                else:
+                    self._matrix = embedding.reshape(1, -1)
+                    self._payloads = []
+                self._payloads.append(payload)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to write semantic cache entry: {e}")
@@ -10,6 +10,10 @@ class Config:
         self.CACHE_DIR = os.getenv("CACHE_DIR", "data/cache")
         self.ATTACHMENTS_DIR = os.getenv("ATTACHMENTS_DIR", "data/attachments")
         self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+        # Compress long email bodies with LLMLingua-2 before prompting (needs `llmlingua`)
+        self.ENABLE_PROMPT_COMPRESSION = os.getenv("ENABLE_PROMPT_COMPRESSION", "false").lower() == "true"
+        # Cache extracted attachment text on disk (set ATTACHMENT_CACHE=off to disable)
+        self.ENABLE_ATTACHMENT_CACHE = os.getenv("ATTACHMENT_CACHE", "on").lower() not in ("off", "false", "0")
 
     def __repr__(self):
         return f"<Config GOOGLE_CLIENT_SECRET_FILE={self.GOOGLE_CLIENT_SECRET_FILE}, LOG_LEVEL={self.LOG_LEVEL}>"
@@ -0,0 +1,64 @@
+# src/utils/llm_client.py
+
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Awaitable, Optional, TypeVar
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def get_rate_limiter(requests_per_minute: int, max_bucket_size: int = 1) -> InMemoryRateLimiter:
+    """Return a process-wide rate limiter for the given Gemini request budget"""
+    return InMemoryRateLimiter(
+        requests_per_second=requests_per_minute / 60,
+        max_bucket_size=max_bucket_size,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model: str = "gemini-2.5-flash",
+                   temperature: float = 0.1,
+                   max_tokens: int = 2048,
+                   timeout: int = 30,
+                   max_retries: int = 3,
+                   rate_limiter: Optional[InMemoryRateLimiter] = None) -> ChatGoogleGenerativeAI:
+    """
+    Return a shared Gemini chat model for the given settings.
+
+    Models are cached per configuration so every caller reuses the same
+    client - and with it the same long-lived gRPC channel - instead of
+    paying a fresh TLS handshake per component or per call.
+    """
+    return ChatGoogleGenerativeAI(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=timeout,
+        max_retries=max_retries,
+        rate_limiter=rate_limiter,
+        transport="grpc",
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Start the process-wide event loop on a daemon thread"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+    return loop
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion on the shared background event loop.
+
+    The cached chat models and embedders bind their async gRPC clients to the
+    loop they first run on, so every batch must use the same long-lived loop
+    rather than a fresh asyncio.run loop per call.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_event_loop()).result()